@@ -0,0 +1,275 @@
+#Benchmark the registry tooling against synthetic registries at multiples of today's size
+#Usage: python3 benchmark.py [--scales 1,10,100] [--benchmarks all] [--repeat 1] [--save baseline.json] [--compare baseline.json]
+#
+#Each synthetic registry repeats every chain, assetlist and IBC file of this tree --scale times under new chain names.
+#Every measurement runs in a fresh interpreter so timings and peak memory of one benchmark don't leak into the next.
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from registry_tools.registry import CHAIN_DIRS, IBC_DIRS, chain_folders, load_json
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+UTILITY_DIR = os.path.join(REPO_DIR, '.github', 'workflows', 'utility')
+
+BENCHMARKS = ['generate_playbook', 'ansible_generator', 'dockerfile_generator', 'check_chains', 'ibc_tests']
+
+# Slowdown against a saved baseline that gets flagged, small absolute differences are noise
+REGRESSION_THRESHOLD = 1.2
+REGRESSION_MIN_SECONDS = 0.05
+
+
+def copy_name(name, copy):
+    return name if copy == 0 else f"{name}x{copy}"
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=2, ensure_ascii=False)
+
+
+def repair_assetlist(chain_info, assetlist):
+    # A few real assetlists fail validate_data; patch them so check_chains walks every synthetic chain
+    bases = set()
+    for asset in assetlist.get('assets', []):
+        denoms = set()
+        for unit in asset.get('denom_units', []):
+            denoms.add(unit['denom'])
+            denoms.update(unit.get('aliases', []))
+        for denom in (asset.get('base'), asset.get('display')):
+            if denom is not None and denom not in denoms:
+                asset['denom_units'].append({'denom': denom, 'exponent': 0})
+                denoms.add(denom)
+        bases.add(asset.get('base'))
+    for key, tokens in (('fees', 'fee_tokens'), ('staking', 'staking_tokens')):
+        for token in chain_info.get(key, {}).get(tokens, []):
+            if token['denom'] not in bases:
+                assetlist['assets'].append({'denom_units': [{'denom': token['denom'], 'exponent': 0}],
+                                            'base': token['denom'], 'display': token['denom'],
+                                            'name': token['denom'], 'symbol': token['denom']})
+                bases.add(token['denom'])
+
+
+def build_registry(source, target, scale):
+    for chain_dir in CHAIN_DIRS:
+        base_dir = os.path.join(source, chain_dir)
+        # Some folders, e.g. _non-cosmos/picasso, only have an assetlist but are still referenced by IBC files
+        folders = sorted(set(chain_folders(base_dir, 'chain.json')) | set(chain_folders(base_dir, 'assetlist.json')))
+        for folder in folders:
+            chain_path = os.path.join(base_dir, folder, 'chain.json')
+            assetlist_path = os.path.join(base_dir, folder, 'assetlist.json')
+            chain_info = load_json(chain_path) if os.path.exists(chain_path) else None
+            assetlist = load_json(assetlist_path) if os.path.exists(assetlist_path) else None
+            if assetlist is not None:
+                repair_assetlist(chain_info or {}, assetlist)
+            pretty_name = chain_info.get('pretty_name') if chain_info else None
+            chain_id = chain_info.get('chain_id') if chain_info else None
+            for copy in range(scale):
+                name = copy_name(folder, copy)
+                os.makedirs(os.path.join(target, chain_dir, name), exist_ok=True)
+                if chain_info is not None:
+                    if copy:
+                        chain_info['chain_name'] = name
+                        if pretty_name:
+                            chain_info['pretty_name'] = f"{pretty_name} #{copy}"
+                        if chain_id:
+                            chain_info['chain_id'] = f"{chain_id}-x{copy}"
+                    write_json(os.path.join(target, chain_dir, name, 'chain.json'), chain_info)
+                if assetlist is not None:
+                    assetlist['chain_name'] = name
+                    write_json(os.path.join(target, chain_dir, name, 'assetlist.json'), assetlist)
+
+    for ibc_dir in IBC_DIRS:
+        os.makedirs(os.path.join(target, ibc_dir), exist_ok=True)
+        for file_name in sorted(os.listdir(os.path.join(source, ibc_dir))):
+            if not file_name.endswith('.json'):
+                continue
+            ibc_data = load_json(os.path.join(source, ibc_dir, file_name))
+            names = (ibc_data['chain_1']['chain_name'], ibc_data['chain_2']['chain_name'])
+            for copy in range(scale):
+                data = json.loads(json.dumps(ibc_data))
+                data['chain_1']['chain_name'] = copy_name(names[0], copy)
+                data['chain_2']['chain_name'] = copy_name(names[1], copy)
+                # Suffixes can change the alphabetical order the IBC tests enforce
+                if data['chain_1']['chain_name'].lower() > data['chain_2']['chain_name'].lower():
+                    data['chain_1'], data['chain_2'] = data['chain_2'], data['chain_1']
+                    for channel in data.get('channels', []):
+                        channel['chain_1'], channel['chain_2'] = channel['chain_2'], channel['chain_1']
+                chain_1, chain_2 = data['chain_1']['chain_name'], data['chain_2']['chain_name']
+                write_json(os.path.join(target, ibc_dir, f"{chain_1}-{chain_2}.json"), data)
+
+    shutil.copytree(os.path.join(source, '_memo_keys'), os.path.join(target, '_memo_keys'))
+
+
+def registry_size(root):
+    total = 0
+    for directory, _, files in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(directory, name)) for name in files if name.endswith('.json'))
+    return total
+
+
+def prepare(benchmark, root):
+    # Everything returned here is set up outside the measured region
+    if benchmark == 'generate_playbook':
+        from registry_tools.generate_ansible import generate_playbook
+        chain_infos = [load_json(os.path.join(root, folder, 'chain.json')) for folder in chain_folders(root)]
+        return lambda: [generate_playbook(chain_info) for chain_info in chain_infos]
+    if benchmark == 'ansible_generator':
+        from registry_tools.generate_ansible import write_playbooks
+        return lambda: write_playbooks(root)
+    if benchmark == 'dockerfile_generator':
+        from registry_tools.generate_dockerfile import write_dockerfiles
+        return lambda: write_dockerfiles(root)
+    if benchmark == 'check_chains':
+        from registry_tools.validate_data import checkChains
+        # Register every synthetic chain with SLIP-0173/SLIP-0044 instead of downloading the registries
+        slip173 = {'websites': {}, 'mainnet_prefixes': {}, 'testnet_prefixes': {}}
+        slip44 = {'coin_types_by_num': {}, 'coin_types_by_name': {}, 'websites': {}}
+        for folder in chain_folders(root):
+            chain_info = load_json(os.path.join(root, folder, 'chain.json'))
+            pretty_name = chain_info.get('pretty_name')
+            if pretty_name in ('Terra Classic', 'Terra 2.0'):
+                pretty_name = 'Terra'
+            slip173['websites'][pretty_name] = chain_info.get('website', '')
+            slip173['mainnet_prefixes'][pretty_name] = chain_info.get('bech32_prefix')
+            slip173['testnet_prefixes'][pretty_name] = chain_info.get('bech32_prefix')
+            if 'slip44' in chain_info:
+                slip44['coin_types_by_name'][pretty_name] = chain_info['slip44']
+        return lambda: checkChains(root, slip173, slip44)
+    if benchmark == 'ibc_tests':
+        import pytest
+        test_path = os.path.join(UTILITY_DIR, 'test_ibcdata.py')
+
+        def run_tests():
+            exit_code = pytest.main([test_path, '-q', '-p', 'no:cacheprovider', '--rootdir', root])
+            if exit_code != 0:
+                # A failing run is not a valid timing, surface it like a validation error
+                raise RuntimeError(f"pytest exited with {int(exit_code)}")
+        return run_tests
+    raise ValueError(f"Unknown benchmark {benchmark}")
+
+
+def worker(benchmark, root, trace):
+    os.chdir(root)
+    workload = prepare(benchmark, root)
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    error = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            workload()
+        except Exception as e:
+            # Validation stops at the first bad chain, report the error instead of a traceback
+            error = f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - started
+    if error:
+        # A run that stopped early is not a timing, keep it out of --save baselines and --compare ratios
+        print(json.dumps({'error': error}))
+        return
+    result = {'seconds': seconds, 'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if trace:
+        result['python_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    print(json.dumps(result))
+
+
+def measure(benchmark, root, trace):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', benchmark, '--root', root]
+    if trace:
+        command.append('--trace')
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'worker failed'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(scales, benchmarks, repeat, memory, workdir):
+    results = {}
+    for scale in scales:
+        root = os.path.join(workdir, f"registry-{scale}x")
+        if not os.path.isdir(root):
+            build_registry(REPO_DIR, root, scale)
+        print(f"{scale}x registry: {len(chain_folders(root))} chains, {registry_size(root) / 1024 / 1024:.1f} MB of JSON")
+        for benchmark in benchmarks:
+            runs = [measure(benchmark, root, False) for _ in range(repeat)]
+            # One failed repeat makes the whole measurement a failure, not the fastest of the rest
+            failed = [run for run in runs if 'seconds' not in run]
+            result = failed[0] if failed else min(runs, key=lambda run: run['seconds'])
+            if memory and not failed:
+                traced = measure(benchmark, root, True)
+                if 'python_peak_mb' in traced:
+                    result['python_peak_mb'] = traced['python_peak_mb']
+            results[f"{benchmark}@{scale}x"] = result
+            print_result(benchmark, scale, result)
+    return results
+
+
+def print_result(benchmark, scale, result, baseline=None):
+    if 'seconds' not in result:
+        print(f"  {benchmark:<22} {scale:>4}x  failed: {result.get('error')}")
+        return
+    line = f"  {benchmark:<22} {scale:>4}x {result['seconds']:>9.3f}s  rss {result['max_rss_mb']:>8.1f} MB"
+    if 'python_peak_mb' in result:
+        line += f"  python peak {result['python_peak_mb']:>8.1f} MB"
+    # Baselines saved before failed runs dropped their timing may still carry both
+    if baseline and 'seconds' in baseline and 'error' not in baseline:
+        ratio = result['seconds'] / baseline['seconds'] if baseline['seconds'] else 1
+        line += f"  {ratio:>5.2f}x baseline"
+        if ratio > REGRESSION_THRESHOLD and result['seconds'] - baseline['seconds'] > REGRESSION_MIN_SECONDS:
+            line += '  REGRESSION'
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark registry tooling on synthetic large registries')
+    parser.add_argument('--scales', default='1,10,100', help='comma separated multiples of the current registry')
+    parser.add_argument('--benchmarks', default='all', help=f"comma separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=1, help='timed runs per benchmark, the fastest is reported')
+    parser.add_argument('--no-memory', action='store_true', help='skip the extra tracemalloc run per benchmark')
+    parser.add_argument('--workdir', help='where synthetic registries are built and kept (default: temporary)')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare against results saved by an earlier --save')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.root, args.trace)
+        return
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    benchmarks = BENCHMARKS if args.benchmarks == 'all' else args.benchmarks.split(',')
+    for benchmark in benchmarks:
+        if benchmark not in BENCHMARKS:
+            sys.exit(f"Unknown benchmark {benchmark}")
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run_benchmarks(scales, benchmarks, args.repeat, not args.no_memory, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run_benchmarks(scales, benchmarks, args.repeat, not args.no_memory, workdir)
+
+    if args.compare:
+        baseline = load_json(args.compare)
+        print(f"\nCompared with {args.compare}")
+        for key, result in results.items():
+            benchmark, scale = key.rsplit('@', 1)
+            print_result(benchmark, int(scale[:-1]), result, baseline.get(key))
+    if args.save:
+        write_json(args.save, results)
+        print(f"Saved results to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
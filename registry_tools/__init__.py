@@ -0,0 +1,31 @@
+#Chain registry tooling as an importable library, see registry_tools/cli.py for the command line.
+#Submodules are imported on first attribute access so importing the package stays cheap.
+import importlib
+
+_EXPORTS = {
+    'generate_playbook': 'generate_ansible',
+    'write_playbooks': 'generate_ansible',
+    'generate_dockerfiles': 'generate_dockerfile',
+    'write_dockerfiles': 'generate_dockerfile',
+    'checkChains': 'validate_data',
+    'runAll': 'validate_data',
+    'AssetIndex': 'asset_index',
+    'build_asset_index': 'asset_index',
+    'calculate_rewards': 'rewards',
+    'generate_upgrade_playbook': 'upgrade',
+    'write_upgrade_playbook': 'upgrade',
+    'RegistryIndex': 'registry_server',
+    'SyncMonitor': 'sync_monitor',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
@@ -0,0 +1,196 @@
+#Prebuilt, memory-mappable lookup index over every assetlist.json in the registry
+#Usage: python3 -m registry_tools assets build [--root .] [--index asset_index.bin]
+#       python3 -m registry_tools assets lookup uosmo        (exact denom, alias, symbol or coingecko_id)
+#       python3 -m registry_tools assets prefix factory/     (every key starting with the prefix)
+#
+#The index is one file: a header, a table of fixed-size entries sorted by key and a blob of UTF-8 strings.
+#Readers mmap it and binary search the table, so any number of processes share the same page cache
+#instead of each parsing the assetlists into dicts.
+import argparse
+import mmap
+import os
+import struct
+
+from .registry import CHAIN_DIRS, chain_folders, load_json
+
+DEFAULT_INDEX = 'asset_index.bin'
+
+MAGIC = b'CRAI'
+VERSION = 1
+# magic, version, entry count
+HEADER = struct.Struct('<4sII')
+# key offset/length, chain offset/length, base offset/length, exponent, kind
+ENTRY = struct.Struct('<IHIHIHBB')
+
+KINDS = ['denom', 'alias', 'symbol', 'coingecko_id']
+
+
+def asset_keys(asset):
+    # (key, kind, exponent) for everything an asset can be looked up by; symbol and
+    # coingecko_id resolve to the display unit since that is what they name
+    denom_units = asset.get('denom_units', [])
+    display_exponent = next((unit.get('exponent', 0) for unit in denom_units
+                             if unit.get('denom') == asset.get('display')), 0)
+    for unit in denom_units:
+        yield unit['denom'], 'denom', unit.get('exponent', 0)
+        for alias in unit.get('aliases', []):
+            yield alias, 'alias', unit.get('exponent', 0)
+    if asset.get('symbol'):
+        yield asset['symbol'], 'symbol', display_exponent
+    if asset.get('coingecko_id'):
+        yield asset['coingecko_id'], 'coingecko_id', display_exponent
+
+
+def collect_entries(root):
+    entries = set()
+    for chain_dir in CHAIN_DIRS:
+        base_dir = os.path.join(root, chain_dir)
+        for chain_folder in chain_folders(base_dir, 'assetlist.json'):
+            assetlist = load_json(os.path.join(base_dir, chain_folder, 'assetlist.json'))
+            chain_name = assetlist.get('chain_name', chain_folder)
+            for asset in assetlist.get('assets', []):
+                for key, kind, exponent in asset_keys(asset):
+                    # ENTRY stores the exponent in one unsigned byte
+                    if not isinstance(exponent, int) or not 0 <= exponent <= 255:
+                        raise ValueError(f"{chain_name} {asset['base']}: exponent {exponent!r} of {kind} {key} is not an integer from 0 to 255")
+                    entries.add((key.encode('utf-8'), chain_name, asset['base'], exponent, KINDS.index(kind)))
+    return sorted(entries)
+
+
+def build_asset_index(root='.', index_path=None):
+    index_path = index_path or os.path.join(root, DEFAULT_INDEX)
+    entries = collect_entries(root)
+
+    strings = bytearray()
+    string_offsets = {}
+
+    def intern(value):
+        if value not in string_offsets:
+            string_offsets[value] = len(strings)
+            strings.extend(value)
+        return string_offsets[value], len(value)
+
+    table = bytearray()
+    for key, chain_name, base, exponent, kind in entries:
+        key_offset, key_length = intern(key)
+        chain_offset, chain_length = intern(chain_name.encode('utf-8'))
+        base_offset, base_length = intern(base.encode('utf-8'))
+        table.extend(ENTRY.pack(key_offset, key_length, chain_offset, chain_length, base_offset, base_length,
+                                exponent, kind))
+
+    # Write next to the target and rename, processes that still map the old file keep a consistent view
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        index_file.write(table)
+        index_file.write(strings)
+    os.replace(temp_path, index_path)
+    return index_path, len(entries)
+
+
+class AssetIndex:
+    def __init__(self, index_path=DEFAULT_INDEX):
+        with open(index_path, 'rb') as index_file:
+            self.map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{index_path} is not a version {VERSION} asset index, rebuild it")
+        self.strings_offset = HEADER.size + self.count * ENTRY.size
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.map.close()
+
+    def string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.map[start:start + length]
+
+    def key(self, position):
+        key_offset, key_length = struct.unpack_from('<IH', self.map, HEADER.size + position * ENTRY.size)
+        return self.string(key_offset, key_length)
+
+    def entry(self, position):
+        key_offset, key_length, chain_offset, chain_length, base_offset, base_length, exponent, kind = \
+            ENTRY.unpack_from(self.map, HEADER.size + position * ENTRY.size)
+        return {
+            'key': self.string(key_offset, key_length).decode('utf-8'),
+            'kind': KINDS[kind],
+            'chain_name': self.string(chain_offset, chain_length).decode('utf-8'),
+            'base': self.string(base_offset, base_length).decode('utf-8'),
+            'exponent': exponent,
+        }
+
+    def lower_bound(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, key, kind=None):
+        key = key.encode('utf-8')
+        results = []
+        position = self.lower_bound(key)
+        while position < self.count and self.key(position) == key:
+            entry = self.entry(position)
+            if kind is None or entry['kind'] == kind:
+                results.append(entry)
+            position += 1
+        return results
+
+    def prefix(self, prefix, kind=None, limit=None):
+        prefix = prefix.encode('utf-8')
+        results = []
+        position = self.lower_bound(prefix)
+        while position < self.count and self.key(position).startswith(prefix):
+            entry = self.entry(position)
+            if kind is None or entry['kind'] == kind:
+                results.append(entry)
+                if limit is not None and len(results) >= limit:
+                    break
+            position += 1
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools assets', description='Build or query the asset lookup index')
+    parser.add_argument('action', choices=['build', 'lookup', 'prefix'])
+    parser.add_argument('key', nargs='?', help='key or prefix to look up')
+    parser.add_argument('--root', default='.', help='chain registry root directory')
+    parser.add_argument('--index', help=f'index file (default: <root>/{DEFAULT_INDEX})')
+    parser.add_argument('--kind', choices=KINDS, help='only match this kind of key')
+    parser.add_argument('--limit', type=int, default=100, help='maximum prefix matches to print')
+    args = parser.parse_args(argv)
+    index_path = args.index or os.path.join(args.root, DEFAULT_INDEX)
+
+    if args.action == 'build':
+        index_path, count = build_asset_index(args.root, index_path)
+        print(f"Indexed {count} asset keys in {index_path} ({os.path.getsize(index_path) / 1024:.0f} KB)")
+        return
+    if not args.key:
+        parser.error(f"{args.action} needs a key")
+    with AssetIndex(index_path) as index:
+        if args.action == 'lookup':
+            matches = index.lookup(args.key, args.kind)
+        else:
+            matches = index.prefix(args.key, args.kind, args.limit)
+    if not matches:
+        print(f"No assets match {args.key}")
+    for match in matches:
+        print(f"{match['key']}  {match['kind']}  {match['chain_name']}  base={match['base']}  exponent={match['exponent']}")
+
+
+if __name__ == '__main__':
+    main()
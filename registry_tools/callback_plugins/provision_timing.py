@@ -0,0 +1,120 @@
+#Ansible callback that records how long every task of a provisioning run takes.
+#python3 -m registry_tools ansible copies this file next to each generated playbook, where Ansible loads it automatically.
+#Timings are stored in SQLite (PROVISION_TIMING_DB, default ~/.ansible/provision_timing.sqlite); see python3 -m registry_tools report.
+import os
+import sqlite3
+import time
+import uuid
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = '''
+    name: provision_timing
+    type: aggregate
+    short_description: Records per-task durations of chain provisioning runs
+    description:
+      - Stores the duration, host, chain and status of every task in a SQLite database.
+      - Runs can be compared with "python3 -m registry_tools report" from the chain registry repository.
+    options:
+      db_path:
+        description: SQLite database the timings are written to.
+        default: ~/.ansible/provision_timing.sqlite
+        env:
+          - name: PROVISION_TIMING_DB
+        ini:
+          - section: callback_provision_timing
+            key: db_path
+        type: path
+'''
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    playbook TEXT,
+    chain TEXT,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS task_timings (
+    run_id TEXT,
+    chain TEXT,
+    host TEXT,
+    task TEXT,
+    position INTEGER,
+    status TEXT,
+    started REAL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS task_timings_chain ON task_timings (chain, task);
+'''
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'provision_timing'
+    # Load without being listed in callbacks_enabled
+    CALLBACK_NEEDS_ENABLED = False
+    CALLBACK_NEEDS_WHITELIST = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.run_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        self.playbook = None
+        self.chain = None
+        self.started = time.time()
+        self.task_started = {}
+        self.task_positions = {}
+        self.host_started = {}
+        self.rows = []
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = os.path.basename(playbook._file_name)
+
+    def v2_playbook_on_play_start(self, play):
+        # Generated playbooks carry the chain in their vars, fall back to the play name
+        self.chain = play.get_vars().get('chain_name') or play.get_name()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self.task_started[task._uuid] = time.time()
+        self.task_positions.setdefault(task._uuid, len(self.task_positions))
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.v2_playbook_on_task_start(task, False)
+
+    def v2_runner_on_start(self, host, task):
+        self.host_started[(host.get_name(), task._uuid)] = time.time()
+
+    def record(self, result, status):
+        task = result._task
+        host = result._host.get_name()
+        finished = time.time()
+        started = self.host_started.pop((host, task._uuid), None) or self.task_started.get(task._uuid, finished)
+        self.rows.append((self.run_id, self.chain, host, task.get_name(), self.task_positions.get(task._uuid),
+                          status, started, finished - started))
+
+    def v2_runner_on_ok(self, result):
+        self.record(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.record(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self.record(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self.record(result, 'unreachable')
+
+    def v2_playbook_on_stats(self, stats):
+        db_path = os.path.expanduser(self.get_option('db_path'))
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        connection = sqlite3.connect(db_path)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.execute('INSERT INTO runs VALUES (?, ?, ?, ?, ?)',
+                                   (self.run_id, self.playbook, self.chain, self.started, time.time()))
+                connection.executemany('INSERT INTO task_timings VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self.rows)
+        finally:
+            connection.close()
+        self._display.display(f"Recorded {len(self.rows)} task timings for run {self.run_id} in {db_path}")
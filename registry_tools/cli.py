@@ -0,0 +1,34 @@
+#Single entry point for the registry tooling: python3 -m registry_tools <command> [options]
+#Only the module behind the chosen command is imported.
+import argparse
+import importlib
+import sys
+
+COMMANDS = {
+    'ansible': ('generate_ansible', 'generate an install playbook for every chain'),
+    'dockerfile': ('generate_dockerfile', 'generate a Dockerfile and docker-compose.yml for every chain'),
+    'validate': ('validate_data', 'validate chain.json and assetlist.json against each other and SLIP-0173/0044'),
+    'assets': ('asset_index', 'build or query the denom/symbol/coingecko_id lookup index'),
+    'rewards': ('rewards', 'estimate delegator and validator APR/APY from a running node'),
+    'upgrade': ('upgrade', 'generate a rolling cosmovisor upgrade playbook from codebase.versions'),
+    'mock-daemon': ('mock_daemon', 'run a mock chain daemon for testing playbooks and the monitor'),
+    'serve': ('registry_server', 'serve registry data from an in-memory index over HTTP'),
+    'monitor': ('sync_monitor', 'monitor sync progress of every node in an inventory'),
+    'report': ('provision_report', 'report provisioning task timings and regressions'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools', description='Chain registry tooling',
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog='commands:\n' + '\n'.join(f'  {name:<12}{description}' for name, (_, description) in COMMANDS.items()))
+    parser.add_argument('command', choices=COMMANDS, metavar='command')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='options for the command, see <command> --help')
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(f'{__package__}.{COMMANDS[args.command][0]}')
+    return module.main(args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
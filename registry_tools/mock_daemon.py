@@ -0,0 +1,129 @@
+#Stand-in for a chain daemon, for trying playbooks, upgrades and the sync monitor without a real network
+#Usage: python3 -m registry_tools mock-daemon [--home DIR] [--version v1.0.0] [--halt-height H --halt-upgrade NAME] start
+#       python3 -m registry_tools mock-daemon version
+#
+#"start" serves a Tendermint style /status on --rpc-port and produces a block every --block-time seconds,
+#reporting catching_up (at --catch-up-speed times the block rate) for the first --catch-up-seconds.
+#The height is kept in <home>/data/mock_height so a restarted or upgraded mock continues where it stopped.
+#With --halt-height it stops like a chain reaching an upgrade: it writes <home>/data/upgrade-info.json,
+#logs UPGRADE "NAME" NEEDED and exits 1, which is what cosmovisor watches for. To run it as the daemon
+#under cosmovisor, install one wrapper script per version, e.g. cosmovisor/genesis/bin/<daemon>:
+#  #!/bin/sh
+#  PYTHONPATH=/path/to/chain-registry exec python3 -m registry_tools mock-daemon --version v16.0.2 --halt-height 120 --halt-upgrade v17 "$@"
+#and cosmovisor/upgrades/v17/bin/<daemon> without the --halt options.
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockChain:
+    def __init__(self, home, chain_id, block_time, catch_up_seconds, catch_up_speed, halt_height, halt_upgrade):
+        self.home = home
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.catch_up_until = time.monotonic() + catch_up_seconds
+        self.catch_up_speed = catch_up_speed
+        self.halt_height = halt_height
+        self.halt_upgrade = halt_upgrade
+        self.height_path = os.path.join(home, 'data', 'mock_height')
+        os.makedirs(os.path.dirname(self.height_path), exist_ok=True)
+        self.height = 0
+        if os.path.exists(self.height_path):
+            with open(self.height_path) as height_file:
+                self.height = int(height_file.read())
+        self.halted = threading.Event()
+
+    def catching_up(self):
+        return time.monotonic() < self.catch_up_until
+
+    def produce_blocks(self):
+        while not self.halted.is_set():
+            time.sleep(self.block_time / (self.catch_up_speed if self.catching_up() else 1))
+            if self.halt_height and self.height + 1 >= self.halt_height:
+                self.halt()
+                return
+            self.height += 1
+            with open(self.height_path, 'w') as height_file:
+                height_file.write(str(self.height))
+
+    def halt(self):
+        upgrade_info = {'name': self.halt_upgrade, 'height': self.halt_height, 'info': ''}
+        with open(os.path.join(self.home, 'data', 'upgrade-info.json'), 'w') as upgrade_file:
+            json.dump(upgrade_info, upgrade_file)
+        print(f'UPGRADE "{self.halt_upgrade}" NEEDED at height: {self.halt_height}', flush=True)
+        self.halted.set()
+
+    def status(self, version):
+        return {
+            'jsonrpc': '2.0',
+            'id': -1,
+            'result': {
+                'node_info': {'network': self.chain_id, 'version': version},
+                'sync_info': {'latest_block_height': str(self.height), 'catching_up': self.catching_up()},
+            },
+        }
+
+
+def make_handler(chain, version):
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0].rstrip('/') != '/status':
+                self.send_error(404)
+                return
+            body = json.dumps(chain.status(version)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StatusHandler
+
+
+def start(args):
+    home = os.path.expanduser(args.home or os.environ.get('DAEMON_HOME') or '~/.mockd')
+    chain = MockChain(home, args.chain_id, args.block_time, args.catch_up_seconds, args.catch_up_speed,
+                      args.halt_height, args.halt_upgrade)
+    server = ThreadingHTTPServer(('127.0.0.1', args.rpc_port), make_handler(chain, args.version))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"mock daemon {args.version} serving {args.chain_id} at height {chain.height} on http://127.0.0.1:{args.rpc_port}", flush=True)
+    try:
+        chain.produce_blocks()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        server.shutdown()
+    return 1 if chain.halted.is_set() else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools mock-daemon', description='Mock chain daemon for local testing')
+    parser.add_argument('command', choices=['start', 'version'])
+    parser.add_argument('--home', help='node home (default: $DAEMON_HOME or ~/.mockd)')
+    parser.add_argument('--version', default='v1.0.0', help='version reported by "version" and /status')
+    parser.add_argument('--chain-id', default='mock-1')
+    parser.add_argument('--rpc-port', type=int, default=26657)
+    parser.add_argument('--block-time', type=float, default=1, help='seconds per block once caught up')
+    parser.add_argument('--catch-up-seconds', type=float, default=0, help='report catching_up for this long after start')
+    parser.add_argument('--catch-up-speed', type=float, default=10, help='block rate multiplier while catching up')
+    parser.add_argument('--halt-height', type=int, help='stop for an upgrade at this height')
+    parser.add_argument('--halt-upgrade', default='upgrade', help='upgrade name written to upgrade-info.json')
+    # Real daemons get flags such as --x-crisis-skip-assert-invariants from the service unit
+    args, _ = parser.parse_known_args(argv)
+
+    if args.command == 'version':
+        print(args.version)
+        return 0
+    return start(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
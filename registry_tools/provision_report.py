@@ -0,0 +1,146 @@
+#Summarise provisioning timings recorded by registry_tools/callback_plugins/provision_timing.py
+#Usage: python3 -m registry_tools report [--db PATH] [--top 10] [--baseline 5] [--threshold 1.25] [--min-seconds 5]
+#       python3 -m registry_tools report --compare RUN_ID RUN_ID
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+from datetime import datetime
+
+DEFAULT_DB = os.environ.get('PROVISION_TIMING_DB', '~/.ansible/provision_timing.sqlite')
+
+# Wall-clock time of a task is its slowest host; repeated task names within a run are summed.
+# Tasks come back in playbook order.
+TASK_DURATIONS = '''
+SELECT run_id, task, SUM(duration) FROM (
+    SELECT run_id, task, position, MAX(duration) AS duration
+    FROM task_timings GROUP BY run_id, task, position
+) GROUP BY run_id, task ORDER BY run_id, MIN(position)
+'''
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    minutes, seconds = divmod(seconds, 60)
+    if minutes >= 60:
+        return f"{int(minutes // 60)}h{int(minutes % 60):02d}m"
+    if minutes:
+        return f"{int(minutes)}m{int(seconds):02d}s"
+    return f"{seconds:.1f}s"
+
+
+def load_runs(connection):
+    runs = {}
+    for run_id, chain, started, finished in connection.execute(
+            'SELECT run_id, chain, started, finished FROM runs ORDER BY started'):
+        runs[run_id] = {'chain': chain, 'started': started, 'duration': finished - started, 'tasks': {}}
+    for run_id, task, duration in connection.execute(TASK_DURATIONS):
+        if run_id in runs:
+            runs[run_id]['tasks'][task] = duration
+    return runs
+
+
+def runs_by_chain(runs):
+    chains = {}
+    for run_id, run in runs.items():
+        chains.setdefault(run['chain'], []).append(run_id)
+    return chains
+
+
+def slowest_chains(runs, chains, top):
+    latest = [(runs[run_ids[-1]]['duration'], chain, run_ids[-1]) for chain, run_ids in chains.items()]
+    print(f"Slowest chains (latest run of {len(latest)} chains)")
+    for duration, chain, run_id in sorted(latest, reverse=True)[:top]:
+        print(f"  {format_duration(duration):>8}  {chain}  ({run_id})")
+
+
+def slowest_steps(runs, chains, top):
+    durations = {}
+    for run_ids in chains.values():
+        for task, duration in runs[run_ids[-1]]['tasks'].items():
+            durations.setdefault(task, []).append(duration)
+    steps = [(statistics.mean(values), max(values), task) for task, values in durations.items()]
+    print("Slowest steps across the fleet (mean / max over latest runs)")
+    for mean, slowest, task in sorted(steps, reverse=True)[:top]:
+        print(f"  {format_duration(mean):>8} / {format_duration(slowest):>8}  {task}")
+
+
+def regressions(runs, chains, baseline, threshold, min_seconds):
+    found = []
+    for chain, run_ids in sorted(chains.items()):
+        if len(run_ids) < 2:
+            continue
+        latest = runs[run_ids[-1]]
+        previous = [runs[run_id] for run_id in run_ids[-baseline - 1:-1]]
+        checks = [('total', latest['duration'], [run['duration'] for run in previous])]
+        for task, duration in latest['tasks'].items():
+            checks.append((task, duration, [run['tasks'][task] for run in previous if task in run['tasks']]))
+        for task, duration, history in checks:
+            if not history:
+                continue
+            median = statistics.median(history)
+            if duration > median * threshold and duration - median >= min_seconds:
+                found.append((chain, task, median, duration))
+    print(f"Regressions (latest run > {threshold}x median of up to {baseline} previous runs)")
+    if not found:
+        print("  none")
+    for chain, task, median, duration in found:
+        print(f"  {chain}: {task}  {format_duration(median)} -> {format_duration(duration)}")
+    return found
+
+
+def compare(runs, base_id, head_id):
+    for run_id in (base_id, head_id):
+        if run_id not in runs:
+            sys.exit(f"Unknown run {run_id}")
+    base, head = runs[base_id], runs[head_id]
+    print(f"{base_id} ({base['chain']}) -> {head_id} ({head['chain']})")
+    tasks = list(head['tasks']) + [task for task in base['tasks'] if task not in head['tasks']]
+    rows = [('total', base['duration'], head['duration'])]
+    rows += [(task, base['tasks'].get(task), head['tasks'].get(task)) for task in tasks]
+    for task, before, after in rows:
+        delta = '' if before is None or after is None else f"{after - before:+.1f}s"
+        print(f"  {format_duration(before):>8} {format_duration(after):>8} {delta:>9}  {task}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools report', description='Report provisioning task timings and regressions')
+    parser.add_argument('--db', default=DEFAULT_DB, help='timing database written by the provision_timing callback')
+    parser.add_argument('--top', type=int, default=10, help='number of chains and steps to list')
+    parser.add_argument('--baseline', type=int, default=5, help='previous runs per chain to compare the latest run against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio that counts as a regression')
+    parser.add_argument('--min-seconds', type=float, default=5, help='ignore slowdowns smaller than this')
+    parser.add_argument('--compare', nargs=2, metavar='RUN_ID', help='compare two runs task by task')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 when a regression is found')
+    args = parser.parse_args(argv)
+
+    db_path = os.path.expanduser(args.db)
+    if not os.path.exists(db_path):
+        sys.exit(f"No timing database at {db_path}")
+    connection = sqlite3.connect(db_path)
+    try:
+        runs = load_runs(connection)
+    finally:
+        connection.close()
+
+    if args.compare:
+        compare(runs, *args.compare)
+        return
+
+    chains = runs_by_chain(runs)
+    first = datetime.fromtimestamp(min(run['started'] for run in runs.values())) if runs else None
+    print(f"{len(runs)} runs of {len(chains)} chains" + (f" since {first:%Y-%m-%d %H:%M}" if first else ''))
+    print()
+    slowest_chains(runs, chains, args.top)
+    print()
+    slowest_steps(runs, chains, args.top)
+    print()
+    found = regressions(runs, chains, args.baseline, args.threshold, args.min_seconds)
+    if found and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
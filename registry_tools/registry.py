@@ -0,0 +1,33 @@
+#Helpers for walking a chain registry checkout
+import json
+import os
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+
+# Folders (relative to the registry root) that hold one chain per sub-folder
+CHAIN_DIRS = ['.', '_non-cosmos', 'testnets', os.path.join('testnets', '_non-cosmos')]
+
+# Folders (relative to the registry root) that hold one <chain_1>-<chain_2>.json per IBC connection
+IBC_DIRS = ['_IBC', os.path.join('testnets', '_IBC')]
+
+
+def chain_folders(base_dir, file_name='chain.json'):
+    # Chain folders directly under base_dir that contain file_name, skipping testnets and _IBC/_non-cosmos style folders
+    if not os.path.isdir(base_dir):
+        return []
+    return sorted(folder for folder in os.listdir(base_dir)
+                  if not folder.startswith('.') and not folder.startswith('_') and folder != 'testnets'
+                  and os.path.isfile(os.path.join(base_dir, folder, file_name)))
+
+
+def load_chain(base_dir, chain_folder):
+    chain_info = load_json(os.path.join(base_dir, chain_folder, 'chain.json'))
+
+    # Add default RPC and P2P ports if not provided
+    chain_info['rpc_port'] = chain_info.get('rpc_port', 26657)
+    chain_info['p2p_port'] = chain_info.get('p2p_port', 26656)
+    return chain_info
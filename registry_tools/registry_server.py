@@ -0,0 +1,333 @@
+#Serve chains, assetlists, IBC channels and memo keys from an in-memory index of the registry
+#Usage: python3 -m registry_tools serve [--root .] [--host 127.0.0.1] [--port 8080] [--reload-interval 5]
+#
+#  GET /chains                      list of chain names
+#  GET /chains/<chain>              chain.json
+#  GET /chains/<chain>/assetlist    assetlist.json
+#  GET /ibc                         list of connected chain pairs
+#  GET /ibc/<chain>                 every IBC connection involving <chain>
+#  GET /ibc/<chain_a>/<chain_b>     IBC connection between two chains (any order)
+#  GET /memo_keys                   _memo_keys/ICS20_memo_keys.json
+#
+#Add ?fields=apis.rpc,staking.staking_tokens,fees to return only the listed (dotted) fields.
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from .registry import CHAIN_DIRS, IBC_DIRS, load_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+# Rendered responses kept per index generation, least recently used ones are dropped first
+MAX_CACHED_RESPONSES = 1024
+
+MEMO_KEYS_DIR = '_memo_keys'
+
+
+def registry_files(root):
+    # Every JSON file the index is built from, used both to load and to detect changes
+    files = []
+    for chain_dir in CHAIN_DIRS:
+        base = os.path.join(root, chain_dir)
+        if not os.path.isdir(base):
+            continue
+        for chain_folder in sorted(os.listdir(base)):
+            if chain_folder.startswith('.') or chain_folder.startswith('_') or chain_folder == 'testnets':
+                continue
+            for name in ('chain.json', 'assetlist.json'):
+                path = os.path.join(base, chain_folder, name)
+                if os.path.isfile(path):
+                    files.append(path)
+    for data_dir in IBC_DIRS + [MEMO_KEYS_DIR]:
+        base = os.path.join(root, data_dir)
+        if not os.path.isdir(base):
+            continue
+        for name in sorted(os.listdir(base)):
+            if name.endswith('.json'):
+                files.append(os.path.join(base, name))
+    return files
+
+
+def tree_signature(root):
+    signature = []
+    for path in registry_files(root):
+        try:
+            signature.append((path, os.stat(path).st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    return tuple(signature)
+
+
+def pair_key(chain_a, chain_b):
+    return tuple(sorted((chain_a.lower(), chain_b.lower())))
+
+
+class RegistryIndex:
+    def __init__(self, root):
+        self.root = root
+        self.chains = {}
+        self.assetlists = {}
+        self.ibc = {}
+        self.ibc_by_chain = {}
+        self.memo_keys = []
+        self.signature = tree_signature(root)
+        self.load()
+
+    def load(self):
+        for path, _ in self.signature:
+            relative = os.path.relpath(path, self.root)
+            parts = relative.split(os.sep)
+            data = load_json(path)
+            if parts[-1] == 'chain.json':
+                # Mainnets are listed first in CHAIN_DIRS and win on a folder name clash
+                self.chains.setdefault(parts[-2], data)
+            elif parts[-1] == 'assetlist.json':
+                self.assetlists.setdefault(parts[-2], data)
+            elif parts[-2] == '_IBC':
+                chain_1 = data['chain_1']['chain_name']
+                chain_2 = data['chain_2']['chain_name']
+                key = pair_key(chain_1, chain_2)
+                if key in self.ibc:
+                    continue
+                self.ibc[key] = data
+                self.ibc_by_chain.setdefault(key[0], []).append(data)
+                self.ibc_by_chain.setdefault(key[1], []).append(data)
+            elif parts[-2] == MEMO_KEYS_DIR:
+                self.memo_keys.extend(data.get('memo_keys', []))
+
+    def lookup(self, path):
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        if parts == ['chains']:
+            return sorted(self.chains)
+        if len(parts) == 2 and parts[0] == 'chains':
+            return self.chains.get(parts[1])
+        if len(parts) == 3 and parts[0] == 'chains' and parts[2] == 'assetlist':
+            return self.assetlists.get(parts[1])
+        if parts == ['ibc']:
+            return [list(key) for key in sorted(self.ibc)]
+        if len(parts) == 2 and parts[0] == 'ibc':
+            return self.ibc_by_chain.get(parts[1].lower())
+        if len(parts) == 3 and parts[0] == 'ibc':
+            return self.ibc.get(pair_key(parts[1], parts[2]))
+        if parts == ['memo_keys']:
+            return self.memo_keys
+        return None
+
+
+def copy_path(source, target, keys):
+    if not isinstance(source, dict) or keys[0] not in source:
+        return
+    value = source[keys[0]]
+    if len(keys) == 1:
+        target[keys[0]] = value
+    elif isinstance(value, list):
+        # Project every object in a list, e.g. apis.rpc.address; scalars have no fields to project
+        objects = [item for item in value if isinstance(item, dict)]
+        if not objects:
+            return
+        items = target.setdefault(keys[0], [{} for _ in objects])
+        for item, projected in zip(objects, items):
+            copy_path(item, projected, keys[1:])
+    else:
+        copy_path(value, target.setdefault(keys[0], {}), keys[1:])
+
+
+def parse_fields(values):
+    # Sorted and deduplicated so equivalent ?fields= lists share one cached response
+    fields = sorted({field.strip() for value in values for field in value.split(',') if field.strip()})
+    # A field returned whole already contains its sub-fields
+    return tuple(field for field in fields if not any(field.startswith(f'{other}.') for other in fields))
+
+
+def project(data, fields):
+    if isinstance(data, list):
+        return [project(item, fields) for item in data]
+    if not isinstance(data, dict):
+        return data
+    result = {}
+    for field in fields:
+        copy_path(data, result, field.split('.'))
+    return result
+
+
+def accepted_encodings(header):
+    encodings = set()
+    for item in (header or '').split(','):
+        token, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if token:
+            encodings.add(token.lower())
+    return encodings
+
+
+def choose_encoding(header):
+    encodings = accepted_encodings(header)
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+    if 'gzip' in encodings:
+        return 'gzip'
+    return 'identity'
+
+
+def encode_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body)
+    if encoding == 'gzip':
+        # mtime=0 keeps the compressed bytes identical for identical input
+        return gzip.compress(body, mtime=0)
+    return body
+
+
+class RegistryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, root, reload_interval=5):
+        super().__init__(address, RegistryHandler)
+        self.root = root
+        self.reload_interval = reload_interval
+        self.index = RegistryIndex(root)
+        self.responses = OrderedDict()
+        self.failed_signature = None
+        self.lock = threading.Lock()
+        if reload_interval:
+            threading.Thread(target=self.watch, daemon=True).start()
+
+    def watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            self.reload()
+
+    def reload(self):
+        signature = tree_signature(self.root)
+        # A tree that failed to load is only retried once it changes again
+        if signature == self.index.signature or signature == self.failed_signature:
+            return False
+        try:
+            index = RegistryIndex(self.root)
+        except (OSError, ValueError, KeyError) as e:
+            # Keep serving the previous index while a change is half-written or broken
+            self.failed_signature = signature
+            print(f"Reload failed, keeping previous index: {e}")
+            return False
+        self.failed_signature = None
+        with self.lock:
+            self.index = index
+            self.responses = OrderedDict()
+        print(f"Reloaded registry index ({len(index.chains)} chains, {len(index.ibc)} IBC connections)")
+        return True
+
+    def response(self, path, fields, encoding):
+        key = (path, fields, encoding)
+        with self.lock:
+            index = self.index
+            responses = self.responses
+            cached = responses.get(key)
+            if cached is not None:
+                responses.move_to_end(key)
+        if cached is not None:
+            return cached
+
+        data = index.lookup(path)
+        if data is None:
+            return None
+        if fields:
+            data = project(data, fields)
+        body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        if len(body) < MIN_COMPRESS_SIZE:
+            encoding = 'identity'
+        body = encode_body(body, encoding)
+        if encoding != 'identity':
+            # Strong ETags must differ between representations
+            etag = f'{etag}-{encoding}'
+        cached = (body, f'"{etag}"', encoding)
+        # Only cache into the generation the response was built from
+        with self.lock:
+            responses[key] = cached
+            while len(responses) > MAX_CACHED_RESPONSES:
+                responses.popitem(last=False)
+        return cached
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        url = urlparse(self.path)
+        fields = parse_fields(parse_qs(url.query).get('fields', []))
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'))
+        cached = self.server.response(url.path, fields, encoding)
+        if cached is None:
+            body = json.dumps({'error': f'{url.path} not found'}).encode('utf-8')
+            self.send_response(404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+
+        body, etag, encoding = cached
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools serve', description='Serve chain registry data from an in-memory index')
+    parser.add_argument('--root', default='.', help='chain registry root directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--reload-interval', type=float, default=5, help='seconds between change checks, 0 disables hot reload')
+    args = parser.parse_args(argv)
+
+    server = RegistryServer((args.host, args.port), args.root, args.reload_interval)
+    print(f"Serving {len(server.index.chains)} chains and {len(server.index.ibc)} IBC connections on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#Node must be up and running, then use python3 -m registry_tools rewards daemon_name
+import argparse
+import json
+import math
+
+
+# Function to run CLI commands and capture the output
+def run_command(command):
+    import subprocess
+    result = subprocess.run(command, stdout=subprocess.PIPE, shell=True, check=True)
+    return result.stdout.decode('utf-8')
+
+
+def calculate_rewards(cli_command="memed", validator_address=None, run=run_command):
+    if validator_address is None:
+        import random
+
+        # Get a list of validators
+        validators_json = run(f"{cli_command} query staking validators --output json")
+        validators_data = json.loads(validators_json)
+        validators_list = validators_data['validators']
+
+        # Select a random validator address
+        random_validator = random.choice(validators_list)
+        validator_address = random_validator['operator_address']
+
+    # Get the total annual provisions and total bonded tokens from the blockchain
+    annual_provisions = float(run(f"{cli_command} query mint annual-provisions --output json"))
+    bonded_tokens = float(json.loads(run(f"{cli_command} query staking pool --output json"))['bonded_tokens'])
+
+    # Calculate APR and APY for delegators
+    delegator_apr = (annual_provisions / bonded_tokens) * 100
+    delegator_apy = (math.exp(delegator_apr / 100) - 1) * 100
+
+    # Get the validator's current rewards rate and calculate APR and APY
+    validator_rewards_rate = float(json.loads(run(f"{cli_command} query distribution validator-outstanding-rewards {validator_address} --output json"))['rewards'][0]['amount'])
+    validator_apr = (validator_rewards_rate / bonded_tokens) * 100
+    validator_apy = (math.exp(validator_apr / 100) - 1) * 100
+
+    return {
+        'validator_address': validator_address,
+        'delegator_apr': delegator_apr,
+        'delegator_apy': delegator_apy,
+        'validator_apr': validator_apr,
+        'validator_apy': validator_apy,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools rewards', description='Estimate delegator and validator APR/APY from a running node')
+    # Set the CLI command based on the argument, default to "memed"
+    parser.add_argument('daemon_name', nargs='?', default='memed', help='node CLI used for the queries')
+    parser.add_argument('--validator', help='validator operator address (default: a random validator)')
+    args = parser.parse_args(argv)
+    rewards = calculate_rewards(args.daemon_name, args.validator)
+
+    # Print out the APR and APY for both delegators and validators
+    print(f"Delegator APR: {rewards['delegator_apr']:.2f}%")
+    print(f"Delegator APY: {rewards['delegator_apy']:.2f}%")
+    print(f"Validator APR: {rewards['validator_apr']:.2f}%")
+    print(f"Validator APY: {rewards['validator_apy']:.2f}%")
+
+
+if __name__ == '__main__':
+    main()
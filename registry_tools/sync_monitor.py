@@ -0,0 +1,347 @@
+#Watch how far every node in an Ansible inventory is from the tip of its chain
+#Usage: python3 -m registry_tools monitor hosts.ini [--root .] [--interval 15] [--port 9115] [--once]
+#
+#Hosts are matched to chains by a chain_name host/group var or by an inventory group (or parent group) named after
+#the chain folder; other groups such as sentries or rpc only contribute vars.
+#Each node is polled at rpc_url (default http://<ansible_host>:<rpc_port|26657>), the network tip comes from the
+#chain.json apis.rpc list. A node counts as synced by its distance to that tip, not by its catching_up flag, so a
+#node that halted after syncing shows up. Results are served as Prometheus metrics on /metrics and as JSON on /status.json.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+_ssl_context = None
+
+# Public RPCs are polled alongside the nodes, a node this close to their tip counts as in sync
+SYNCED_TOLERANCE_BLOCKS = 3
+
+
+def find_chain_json(root, chain):
+    for chain_dir in (root, os.path.join(root, 'testnets')):
+        chain_json_path = os.path.join(chain_dir, chain, 'chain.json')
+        if os.path.exists(chain_json_path):
+            return chain_json_path
+    return None
+
+
+def parse_inventory(path, root='.'):
+    # Minimal INI inventory reader: [group], [group:vars], [group:children] and "host key=value" lines
+    host_groups = {}
+    inline_vars = {}
+    group_vars = {}
+    parents = {}
+    section = 'ungrouped'
+    with open(path, 'r') as inventory_file:
+        for line in inventory_file:
+            line = line.split('#', 1)[0].split(';', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                section = line[1:-1]
+                continue
+            if section.endswith(':children'):
+                parents.setdefault(line, set()).add(section[:-9])
+                continue
+            if section.endswith(':vars'):
+                key, _, value = line.partition('=')
+                group_vars.setdefault(section[:-5], {})[key.strip()] = value.strip().strip('"\'')
+                continue
+            host, *pairs = line.split()
+            # A host listed under several groups is one node that belongs to all of them
+            if section not in host_groups.setdefault(host, []):
+                host_groups[host].append(section)
+            inline_vars.setdefault(host, {}).update(
+                (key, value.strip('"\'')) for key, _, value in (pair.partition('=') for pair in pairs if '=' in pair))
+
+    def ancestors(group, seen):
+        for parent in parents.get(group, ()):
+            if parent not in seen:
+                seen.add(parent)
+                ancestors(parent, seen)
+        return seen
+
+    def depth(group, seen=()):
+        return 1 + max((depth(parent, seen + (group,)) for parent in parents.get(group, ()) if parent not in seen), default=0)
+
+    nodes = []
+    for host, direct_groups in host_groups.items():
+        groups = set(direct_groups)
+        for group in direct_groups:
+            ancestors(group, groups)
+        groups.discard('all')
+        # Like Ansible, vars of child groups override those of their parents and host vars override both
+        variables = dict(group_vars.get('all', {}))
+        for group in sorted(groups, key=lambda group: (depth(group), group)):
+            variables.update(group_vars.get(group, {}))
+        variables.update(inline_vars[host])
+        # Role groups such as sentries or rpc are not chains, only a group named after a chain folder is
+        chain = variables.get('chain_name') or next(
+            (group for group in sorted(groups, key=lambda group: (-depth(group), group))
+             if find_chain_json(root, group)), None)
+        if not chain:
+            print(f"Skipping {host} - no chain_name var or chain group.")
+            continue
+        address = variables.get('ansible_host', host)
+        rpc_url = variables.get('rpc_url') or f"http://{address}:{variables.get('rpc_port', 26657)}"
+        nodes.append({'host': host, 'chain': chain, 'rpc_url': rpc_url})
+    return nodes
+
+
+def load_public_rpcs(root, chain, limit):
+    chain_json_path = find_chain_json(root, chain)
+    if chain_json_path:
+        with open(chain_json_path, 'r') as json_file:
+            chain_info = json.load(json_file)
+        return [rpc['address'] for rpc in chain_info.get('apis', {}).get('rpc', [])][:limit]
+    print(f"Warning {chain} - no chain.json found, network height unknown.")
+    return []
+
+
+def ssl_context():
+    # Loading the CA bundle is slow, only do it once the first https RPC is polled
+    global _ssl_context
+    if _ssl_context is None:
+        import ssl
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def decode_chunked(body):
+    decoded = b''
+    while body:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0], 16)
+        if size == 0:
+            break
+        decoded += body[:size]
+        body = body[size + 2:]
+    return decoded
+
+
+async def fetch_json(url):
+    parsed = urlsplit(url)
+    https = parsed.scheme == 'https'
+    port = parsed.port or (443 if https else 80)
+    target = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else '')
+    reader, writer = await asyncio.open_connection(parsed.hostname, port, ssl=ssl_context() if https else None)
+    try:
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {parsed.hostname}\r\nAccept: application/json\r\n"
+                     f"Connection: close\r\n\r\n".encode('ascii'))
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = raw.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    status = int(status_line.split()[1])
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}")
+    headers = {key.strip().lower(): value.strip() for key, _, value in (line.partition(':') for line in header_lines)}
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = decode_chunked(body)
+    return json.loads(body)
+
+
+def rate(samples):
+    if len(samples) < 2 or samples[-1][0] == samples[0][0]:
+        return None
+    return (samples[-1][1] - samples[0][1]) / (samples[-1][0] - samples[0][0])
+
+
+class SyncMonitor:
+    def __init__(self, nodes, public_rpcs, interval=15, timeout=5, concurrency=200, window=8):
+        self.nodes = nodes
+        self.public_rpcs = public_rpcs
+        self.interval = interval
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.node_samples = {node['host']: deque(maxlen=window) for node in nodes}
+        self.node_status = {node['host']: {'up': False, 'error': 'not polled yet'} for node in nodes}
+        self.network_samples = {chain: deque(maxlen=window) for chain in public_rpcs}
+        self.last_poll = None
+
+    async def status(self, rpc_url):
+        async with self.semaphore:
+            response = await asyncio.wait_for(fetch_json(rpc_url.rstrip('/') + '/status'), self.timeout)
+        # Tendermint 0.34 wraps the payload in a JSON-RPC envelope, CometBFT 0.38 may not
+        return response.get('result', response)
+
+    async def poll_node(self, node, now):
+        try:
+            result = await self.status(node['rpc_url'])
+            sync_info = result['sync_info']
+            height = int(sync_info['latest_block_height'])
+        except Exception as e:
+            self.node_status[node['host']] = {'up': False, 'error': str(e) or type(e).__name__}
+            return
+        self.node_samples[node['host']].append((now, height))
+        self.node_status[node['host']] = {
+            'up': True,
+            'height': height,
+            'catching_up': bool(sync_info.get('catching_up')),
+            'network': result.get('node_info', {}).get('network'),
+        }
+
+    async def poll_network(self, chain, now):
+        results = await asyncio.gather(*[self.status(url) for url in self.public_rpcs[chain]], return_exceptions=True)
+        heights = [int(result['sync_info']['latest_block_height']) for result in results
+                   if isinstance(result, dict) and 'sync_info' in result]
+        if heights:
+            self.network_samples[chain].append((now, max(heights)))
+
+    async def poll_once(self):
+        now = time.monotonic()
+        await asyncio.gather(*[self.poll_node(node, now) for node in self.nodes],
+                             *[self.poll_network(chain, now) for chain in self.public_rpcs])
+        self.last_poll = time.time()
+
+    async def run(self):
+        while True:
+            started = time.monotonic()
+            await self.poll_once()
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    def summary(self):
+        nodes = []
+        for node in self.nodes:
+            entry = {'host': node['host'], 'chain': node['chain']}
+            entry.update(self.node_status[node['host']])
+            network = self.network_samples.get(node['chain'])
+            network_height = network[-1][1] if network else None
+            node_rate = rate(self.node_samples[node['host']])
+            network_rate = rate(network) if network else None
+            entry['network_height'] = network_height
+            entry['blocks_per_second'] = node_rate
+            entry['network_blocks_per_second'] = network_rate
+            if entry['up'] and network_height is not None:
+                behind = max(network_height - entry['height'], 0)
+                entry['blocks_behind'] = behind
+                # Catch-up speed is how much faster the node moves than the chain itself
+                gain = node_rate - (network_rate or 0) if node_rate is not None else None
+                # catching_up stays false on a node that halted or stopped on an error, so go by the height gap
+                entry['synced'] = behind <= SYNCED_TOLERANCE_BLOCKS
+                if entry['synced']:
+                    entry['eta_seconds'] = 0
+                elif gain and gain > 0:
+                    entry['eta_seconds'] = behind / gain
+                else:
+                    entry['eta_seconds'] = None
+            elif entry['up']:
+                # Without a network height the node's own flag is all there is
+                entry['synced'] = not entry['catching_up']
+            else:
+                entry['synced'] = False
+            nodes.append(entry)
+        return {
+            'last_poll': self.last_poll,
+            'nodes': nodes,
+            'up': sum(1 for node in nodes if node['up']),
+            'synced': sum(1 for node in nodes if node['synced']),
+            'total': len(nodes),
+        }
+
+    def metrics(self):
+        metrics = {
+            'chain_node_up': ('gauge', 'Whether the node RPC answered the last poll'),
+            'chain_node_height': ('gauge', 'Latest block height of the node'),
+            'chain_node_catching_up': ('gauge', 'Whether the node reports catching_up'),
+            'chain_node_blocks_behind': ('gauge', 'Blocks between the node and the public RPC tip'),
+            'chain_node_blocks_per_second': ('gauge', 'Blocks applied per second by the node'),
+            'chain_node_sync_eta_seconds': ('gauge', 'Estimated seconds until the node is in sync'),
+            'chain_network_height': ('gauge', 'Highest block height reported by public RPCs'),
+        }
+        values = {name: [] for name in metrics}
+        summary = self.summary()
+        chains = {}
+        for node in summary['nodes']:
+            labels = f'host="{node["host"]}",chain="{node["chain"]}"'
+            values['chain_node_up'].append((labels, int(node['up'])))
+            if node['network_height'] is not None:
+                chains[node['chain']] = node['network_height']
+            if not node['up']:
+                continue
+            values['chain_node_height'].append((labels, node['height']))
+            values['chain_node_catching_up'].append((labels, int(node['catching_up'])))
+            for key, name in (('blocks_behind', 'chain_node_blocks_behind'),
+                              ('blocks_per_second', 'chain_node_blocks_per_second'),
+                              ('eta_seconds', 'chain_node_sync_eta_seconds')):
+                if node.get(key) is not None:
+                    values[name].append((labels, node[key]))
+        for chain, height in chains.items():
+            values['chain_network_height'].append((f'chain="{chain}"', height))
+
+        lines = []
+        for name, (metric_type, description) in metrics.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(f"{name}{{{labels}}} {value}" for labels, value in values[name])
+        return '\n'.join(lines) + '\n'
+
+
+async def serve(monitor, host, port):
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            path = request_line.decode('latin-1').split(' ')[1] if request_line else '/'
+            if path == '/metrics':
+                status, content_type, body = '200 OK', 'text/plain; version=0.0.4', monitor.metrics()
+            elif path == '/status.json':
+                status, content_type, body = '200 OK', 'application/json', json.dumps(monitor.summary())
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', 'not found\n'
+            body = body.encode('utf-8')
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode('ascii') + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Serving /metrics and /status.json on http://{host}:{port}")
+    return server
+
+
+async def main_async(args):
+    nodes = parse_inventory(args.inventory, args.root)
+    if not nodes:
+        sys.exit(f"No hosts with a chain found in {args.inventory}")
+    public_rpcs = {chain: load_public_rpcs(args.root, chain, args.public_rpcs) for chain in {node['chain'] for node in nodes}}
+    monitor = SyncMonitor(nodes, public_rpcs, args.interval, args.timeout, args.concurrency, args.window)
+
+    if args.once:
+        await monitor.poll_once()
+        print(json.dumps(monitor.summary(), indent=2))
+        return
+
+    server = await serve(monitor, args.host, args.port)
+    async with server:
+        await monitor.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools monitor', description='Monitor sync progress of every node in an inventory')
+    parser.add_argument('inventory', help='Ansible INI inventory, e.g. hosts.ini')
+    parser.add_argument('--root', default='.', help='chain registry root directory')
+    parser.add_argument('--interval', type=float, default=15, help='seconds between polls')
+    parser.add_argument('--timeout', type=float, default=5, help='per-request timeout in seconds')
+    parser.add_argument('--concurrency', type=int, default=200, help='maximum requests in flight')
+    parser.add_argument('--window', type=int, default=8, help='polls used to compute blocks per second')
+    parser.add_argument('--public-rpcs', type=int, default=3, help='public RPCs per chain used for the network height')
+    parser.add_argument('--host', default='127.0.0.1', help='address for the metrics endpoint')
+    parser.add_argument('--port', type=int, default=9115, help='port for the metrics endpoint')
+    parser.add_argument('--once', action='store_true', help='poll once, print the JSON summary and exit')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
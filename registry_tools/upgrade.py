@@ -0,0 +1,354 @@
+#Generate a rolling upgrade playbook from the codebase.versions metadata in chain.json
+#Usage: python3 -m registry_tools upgrade <chain> [--name v17] [--groups sentries,rpc] [--batch-size 1] [--no-height] [--root .]
+#
+#The playbook first stages the new binary in the cosmovisor layout on every host in parallel
+#(~/<node_dir>/cosmovisor/upgrades/<name>/bin/<daemon>) while the node keeps running. It then rolls over the
+#given inventory groups in order, batch_size hosts at a time: the systemd service is moved to cosmovisor and,
+#once a node has reached the upgrade height (or stopped there, per data/upgrade-info.json), cosmovisor is pointed at
+#the new binary and the node restarted. The next batch only starts after the previous one has caught up again.
+#Nodes still below the upgrade height are left running; cosmovisor swaps the binary itself at the height.
+#A host whose height can't be confirmed fails the play. Versions without a height need --no-height, which
+#switches every node as soon as the binary is staged.
+import argparse
+import os
+from urllib.parse import quote
+
+from .registry import load_chain
+
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tgz', '.tar', '.zip', '.gz')
+COSMOVISOR_VERSION = 'v1.5.0'
+
+
+def select_upgrade(chain_info, name=None):
+    versions = chain_info.get('codebase', {}).get('versions') or []
+    if name is not None:
+        for version in versions:
+            if version.get('name') == name:
+                return version
+        return None
+    # Default to the newest version the registry knows about
+    return versions[-1] if versions else None
+
+
+def binary_source(upgrade, platform='linux/amd64'):
+    url = upgrade.get('binaries', {}).get(platform)
+    if not url:
+        return None, None
+    url, _, checksum = url.partition('?checksum=')
+    return url, checksum or None
+
+
+def stage_tasks(chain_info, upgrade, git_ref):
+    daemon_name = chain_info['daemon_name']
+    url, checksum = binary_source(upgrade)
+    if url and not url.endswith(ARCHIVE_SUFFIXES):
+        checksum_line = f'\n        checksum: "{checksum}"' if checksum else ''
+        return f'''
+    - name: Download {daemon_name} {git_ref}
+      get_url:
+        url: "{url}"
+        dest: "{{{{ upgrade_bin_dir }}}}/{daemon_name}"
+        mode: '0755'{checksum_line}
+'''
+    if url:
+        archive_name = os.path.basename(url)
+        checksum_line = f'\n        checksum: "{checksum}"' if checksum else ''
+        return f'''
+    - name: Create download directory for {daemon_name} {git_ref}
+      file:
+        path: "/tmp/{daemon_name}-{{{{ upgrade_name }}}}"
+        state: directory
+
+    # unarchive can't verify a checksum, so download with get_url first and unpack the local file
+    - name: Download {daemon_name} {git_ref} release archive
+      get_url:
+        url: "{url}"
+        dest: "/tmp/{daemon_name}-{{{{ upgrade_name }}}}/{archive_name}"{checksum_line}
+
+    - name: Unpack {daemon_name} {git_ref}
+      unarchive:
+        src: "/tmp/{daemon_name}-{{{{ upgrade_name }}}}/{archive_name}"
+        dest: "/tmp/{daemon_name}-{{{{ upgrade_name }}}}"
+        remote_src: yes
+{find_binary_tasks(daemon_name, f"/tmp/{daemon_name}-{{{{ upgrade_name }}}}", 'release archive')}
+    - name: Cleanup download directory
+      file:
+        path: "/tmp/{daemon_name}-{{{{ upgrade_name }}}}"
+        state: absent
+'''
+    # No published binary, build from source the same way the install playbook does
+    return f'''
+    - name: Clone node repository at {git_ref}
+      git:
+        repo: "{chain_info['codebase']['git_repo']}"
+        dest: "~/node-upgrade"
+        version: "{git_ref}"
+        force: yes
+
+    - name: Compile {daemon_name} {git_ref} with the Go version from go.mod
+      shell: |
+        source ~/.gvm/scripts/gvm
+        GOVERSION=$(egrep '^go [0-9]+\\.[0-9]+' ~/node-upgrade/go.mod | egrep -o '[0-9]+\\.[0-9]+')
+        gvm install "go$GOVERSION"
+        gvm use "go$GOVERSION"
+        make build
+      args:
+        executable: /bin/bash
+        chdir: ~/node-upgrade
+      environment:
+        GOPATH: ~/go
+
+{find_binary_tasks(daemon_name, "{{ ansible_env.HOME }}/node-upgrade", 'build')}
+    - name: Cleanup upgrade build directory
+      file:
+        path: ~/node-upgrade
+        state: absent
+'''
+
+
+def find_binary_tasks(daemon_name, path, source):
+    # Match the exact file name and insist on a single match rather than staging whatever sorts first
+    return f'''
+    - name: Locate the {daemon_name} binary in the {source}
+      find:
+        paths: "{path}"
+        patterns: "{daemon_name}"
+        recurse: yes
+        file_type: file
+      register: found_daemon
+
+    - name: Check the {source} contains exactly one {daemon_name}
+      assert:
+        that: found_daemon.matched == 1
+        fail_msg: "Expected one {daemon_name} in the {source}, found {{{{ found_daemon.files | map(attribute='path') | list }}}}"
+
+    - name: Stage the {daemon_name} binary for cosmovisor
+      copy:
+        src: "{{{{ found_daemon.files[0].path }}}}"
+        dest: "{{{{ upgrade_bin_dir }}}}/{daemon_name}"
+        mode: '0755'
+        remote_src: yes
+'''
+
+
+def rolling_play(chain_info, upgrade, group, rpc_port, play_vars):
+    daemon_name = chain_info['daemon_name']
+    return f'''
+- name: Roll {chain_info['pretty_name']} onto {upgrade['name']} ({group})
+  hosts: {group}
+  serial: "{{{{ batch_size }}}}"
+  max_fail_percentage: 0
+{play_vars}
+  tasks:
+    - name: Run {chain_info['pretty_name']} under cosmovisor
+      blockinfile:
+        path: "/etc/systemd/system/{chain_info['chain_name']}.service"
+        block: |
+          [Unit]
+          Description={chain_info['pretty_name']} Node
+          After=network-online.target
+          [Service]
+          User=root
+          Environment="DAEMON_NAME={daemon_name}"
+          Environment="DAEMON_HOME={{{{ ansible_env.HOME }}}}/{{{{ node_dir }}}}"
+          Environment="DAEMON_ALLOW_DOWNLOAD_BINARIES=false"
+          Environment="DAEMON_RESTART_AFTER_UPGRADE=true"
+          Environment="UNSAFE_SKIP_BACKUP=true"
+          ExecStart=/usr/local/bin/cosmovisor run start --x-crisis-skip-assert-invariants
+          Restart=on-failure
+          RestartSec=10
+          [Install]
+          WantedBy=multi-user.target
+        create: yes
+      register: service_unit
+
+    - name: Read the current block height
+      uri:
+        url: "http://127.0.0.1:{rpc_port}/status"
+        return_content: yes
+      register: node_status
+      ignore_errors: yes
+
+    # A node that stopped at the upgrade height has no RPC, but leaves the plan in data/upgrade-info.json
+    - name: Read the upgrade plan of a stopped node
+      slurp:
+        src: "{{{{ ansible_env.HOME }}}}/{{{{ node_dir }}}}/data/upgrade-info.json"
+      register: upgrade_info
+      ignore_errors: yes
+      when: node_status is failed
+
+    # Switching a node below the height makes it panic, so never guess when the height is unknown
+    - name: Stop if the node is neither answering nor halted for {{{{ upgrade_name }}}}
+      fail:
+        msg: "{{{{ inventory_hostname }}}} RPC is unreachable and data/upgrade-info.json does not name {{{{ upgrade_name }}}}"
+      when: node_status is failed and (upgrade_info is failed or (upgrade_info.content | b64decode | from_json).name != upgrade_name)
+
+    # A running node halted for the upgrade reports the block before the upgrade height
+    - name: Decide whether to switch to {{{{ upgrade_name }}}} now
+      set_fact:
+        switch_now: "{{{{ node_status is failed or upgrade_height | int == 0 or (node_status.json.result.sync_info.latest_block_height | int) >= (upgrade_height | int) - 1 }}}}"
+
+    - name: Point cosmovisor at {{{{ upgrade_name }}}}
+      file:
+        src: "{{{{ cosmovisor_dir }}}}/upgrades/{{{{ upgrade_dir }}}}"
+        dest: "{{{{ cosmovisor_dir }}}}/current"
+        state: link
+        force: yes
+      when: switch_now | bool
+      register: current_link
+
+    - name: Restart {chain_info['pretty_name']}
+      systemd:
+        daemon_reload: yes
+        enabled: yes
+        state: restarted
+        name: {chain_info['chain_name']}
+      when: service_unit is changed or current_link is changed
+      register: restarted
+
+    - name: Wait for {chain_info['pretty_name']} to catch up before the next batch
+      uri:
+        url: "http://127.0.0.1:{rpc_port}/status"
+        return_content: yes
+      register: caught_up
+      until: caught_up.status == 200 and not (caught_up.json.result.sync_info.catching_up | bool)
+      retries: "{{{{ catch_up_retries }}}}"
+      delay: 10
+      when: restarted is changed
+'''
+
+
+def generate_upgrade_playbook(chain_info, upgrade, groups=('all',), batch_size='1', no_height=False):
+    if not chain_info.get('pretty_name') or not chain_info.get('daemon_name') or not chain_info.get('chain_id'):
+        print(f"Skipping {chain_info.get('chain_name', 'Unknown')} - Required information missing.")
+        return None
+
+    node_home = chain_info.get('node_home')
+    if not node_home:
+        print(f"Skipping {chain_info.get('chain_name', 'Unknown')} - node_home not provided.")
+        return None
+
+    git_ref = upgrade.get('tag') or upgrade.get('recommended_version')
+    if not git_ref:
+        print(f"Skipping {chain_info['pretty_name']} - {upgrade['name']} has no tag or recommended_version.")
+        return None
+
+    if not upgrade.get('height') and not no_height:
+        # Without a height every node would be switched right away, before the chain halts for the upgrade
+        print(f"Skipping {chain_info['pretty_name']} - {upgrade['name']} has no upgrade height, pass --no-height to switch as soon as it is staged.")
+        return None
+
+    node_dir = node_home.replace('$HOME/', '')
+    daemon_name = chain_info['daemon_name']
+    rpc_port = chain_info.get('rpc_port', 26657)
+
+    # Play vars don't carry over between plays, every play gets the same block
+    play_vars = f'''
+  vars:
+    chain_name: "{chain_info['chain_name']}"
+    node_dir: "{node_dir}"
+    upgrade_name: "{upgrade['name']}"
+    upgrade_dir: "{quote(upgrade['name'], safe='')}"
+    upgrade_height: "{upgrade.get('height', 0)}"
+    cosmovisor_dir: "{{{{ ansible_env.HOME }}}}/{node_dir}/cosmovisor"
+    upgrade_bin_dir: "{{{{ cosmovisor_dir }}}}/upgrades/{{{{ upgrade_dir }}}}/bin"
+    cosmovisor_version: "{COSMOVISOR_VERSION}"
+    batch_size: "{batch_size}"
+    catch_up_retries: 360
+'''
+
+    playbook_content = f'''
+---
+- name: Stage {chain_info['pretty_name']} {upgrade['name']} for cosmovisor
+  hosts: {':'.join(groups)}
+  strategy: free
+{play_vars}
+  tasks:
+    - name: Check for cosmovisor
+      stat:
+        path: /usr/local/bin/cosmovisor
+      register: cosmovisor_binary
+
+    - name: Install cosmovisor {{{{ cosmovisor_version }}}}
+      unarchive:
+        src: "https://github.com/cosmos/cosmos-sdk/releases/download/cosmovisor%2F{{{{ cosmovisor_version }}}}/cosmovisor-{{{{ cosmovisor_version }}}}-linux-amd64.tar.gz"
+        dest: /usr/local/bin
+        remote_src: yes
+        include:
+          - cosmovisor
+      when: not cosmovisor_binary.stat.exists
+
+    - name: Create cosmovisor directories
+      file:
+        path: "{{{{ item }}}}"
+        state: directory
+      with_items:
+        - "{{{{ cosmovisor_dir }}}}/genesis/bin"
+        - "{{{{ upgrade_bin_dir }}}}"
+
+    - name: Check for the running {daemon_name} in the cosmovisor genesis folder
+      stat:
+        path: "{{{{ cosmovisor_dir }}}}/genesis/bin/{daemon_name}"
+      register: genesis_binary
+
+    - name: Keep the running {daemon_name} as the cosmovisor genesis binary
+      copy:
+        src: "/usr/local/bin/{daemon_name}"
+        dest: "{{{{ cosmovisor_dir }}}}/genesis/bin/{daemon_name}"
+        mode: '0755'
+        remote_src: yes
+      when: not genesis_binary.stat.exists
+
+    - name: Check for an already staged {daemon_name} {git_ref}
+      stat:
+        path: "{{{{ upgrade_bin_dir }}}}/{daemon_name}"
+      register: staged_binary
+
+    - name: Stage {daemon_name} {git_ref}
+      when: not staged_binary.stat.exists
+      block:{indent(stage_tasks(chain_info, upgrade, git_ref), 4)}
+    - name: Check the staged {daemon_name} runs
+      command: "{{{{ upgrade_bin_dir }}}}/{daemon_name} version"
+      changed_when: false
+'''
+    for group in groups:
+        playbook_content += rolling_play(chain_info, upgrade, group, rpc_port, play_vars)
+    return playbook_content
+
+
+def indent(text, spaces):
+    return ''.join(' ' * spaces + line if line.strip() else line for line in text.splitlines(True))
+
+
+def write_upgrade_playbook(base_dir, chain_folder, name=None, groups=('all',), batch_size='1', no_height=False):
+    chain_info = load_chain(base_dir, chain_folder)
+    upgrade = select_upgrade(chain_info, name)
+    if upgrade is None:
+        print(f"Skipping {chain_folder} - no {name or 'codebase.versions'} entry in chain.json.")
+        return None
+
+    playbook_content = generate_upgrade_playbook(chain_info, upgrade, groups, batch_size, no_height)
+    if playbook_content is None:
+        return None
+    playbook_path = os.path.join(base_dir, chain_folder, f"upgrade_{chain_folder}_{quote(upgrade['name'], safe='')}.yml")
+    with open(playbook_path, 'w') as playbook_file:
+        playbook_file.write(playbook_content)
+    print(f"Generated {upgrade['name']} upgrade playbook for {chain_info['pretty_name']} at {playbook_path}")
+    print(f"Run with: ansible-playbook -i hosts.ini {playbook_path} (override -e batch_size=... -e catch_up_retries=...)")
+    return playbook_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='registry_tools upgrade', description='Generate a rolling cosmovisor upgrade playbook')
+    parser.add_argument('chain', help='chain folder, e.g. juno')
+    parser.add_argument('--name', help='upgrade name from codebase.versions (default: the newest)')
+    parser.add_argument('--groups', default='all', help='comma separated inventory groups to roll through, in order')
+    parser.add_argument('--batch-size', default='1', help='hosts per batch, a number or a percentage such as 25%%')
+    parser.add_argument('--no-height', action='store_true', help='allow a version without an upgrade height, nodes switch as soon as it is staged')
+    parser.add_argument('--root', default='.', help='chain registry root directory')
+    args = parser.parse_args(argv)
+    write_upgrade_playbook(args.root, args.chain, args.name, args.groups.split(','), args.batch_size, args.no_height)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import json
+import os
+import struct
+
+import pytest
+
+from registry_tools.asset_index import HEADER, MAGIC, VERSION, AssetIndex, build_asset_index
+
+
+def write_assetlist(root, chain_dir, chain_name, assets):
+    folder = os.path.join(root, chain_dir, chain_name)
+    os.makedirs(folder)
+    with open(os.path.join(folder, 'assetlist.json'), 'w') as assetlist_file:
+        json.dump({'chain_name': chain_name, 'assets': assets}, assetlist_file)
+
+
+def asset(base, display, exponent, symbol, coingecko_id=None, aliases=()):
+    entry = {
+        'denom_units': [{'denom': base, 'exponent': 0, 'aliases': list(aliases)},
+                        {'denom': display, 'exponent': exponent}],
+        'base': base,
+        'display': display,
+        'symbol': symbol,
+    }
+    if coingecko_id:
+        entry['coingecko_id'] = coingecko_id
+    return entry
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    write_assetlist(tmp_path, '.', 'osmosis', [
+        asset('uosmo', 'osmo', 6, 'OSMO', 'osmosis'),
+        asset('factory/osmo1abc/utoken', 'token', 8, 'TOKEN'),
+        asset('factory/osmo1abc/uother', 'other', 6, 'OTHER'),
+    ])
+    write_assetlist(tmp_path, '.', 'juno', [
+        asset('ujuno', 'juno', 6, 'JUNO', 'juno-network', aliases=['microjuno']),
+        asset('cw20:juno1xyz', 'cw20:juno1xyz', 0, 'OSMO'),
+    ])
+    write_assetlist(tmp_path, 'testnets', 'osmosistestnet', [asset('uosmo', 'osmo', 6, 'OSMO')])
+    path, count = build_asset_index(str(tmp_path), str(tmp_path / 'assets.bin'))
+    # osmosis 4 + 3 + 3, juno 5 + 2 and the testnet 3; the cw20 base and display unit are one key
+    assert count == 20
+    return path
+
+
+def test_lookup(index_path):
+    with AssetIndex(index_path) as index:
+        assert len(index) == 20
+        assert index.lookup('uosmo') == [
+            {'key': 'uosmo', 'kind': 'denom', 'chain_name': 'osmosis', 'base': 'uosmo', 'exponent': 0},
+            {'key': 'uosmo', 'kind': 'denom', 'chain_name': 'osmosistestnet', 'base': 'uosmo', 'exponent': 0},
+        ]
+        assert index.lookup('microjuno') == [
+            {'key': 'microjuno', 'kind': 'alias', 'chain_name': 'juno', 'base': 'ujuno', 'exponent': 0}]
+        # Symbols and coingecko ids resolve to the display unit
+        assert index.lookup('juno-network') == [
+            {'key': 'juno-network', 'kind': 'coingecko_id', 'chain_name': 'juno', 'base': 'ujuno', 'exponent': 6}]
+        assert index.lookup('missing') == []
+
+
+def test_lookup_kind(index_path):
+    with AssetIndex(index_path) as index:
+        symbols = index.lookup('OSMO', kind='symbol')
+        assert [(entry['chain_name'], entry['base']) for entry in symbols] == [
+            ('juno', 'cw20:juno1xyz'), ('osmosis', 'uosmo'), ('osmosistestnet', 'uosmo')]
+        assert index.lookup('osmo', kind='denom')[0]['exponent'] == 6
+        assert index.lookup('uosmo', kind='symbol') == []
+
+
+def test_prefix(index_path):
+    with AssetIndex(index_path) as index:
+        matches = index.prefix('factory/')
+        assert [entry['key'] for entry in matches] == ['factory/osmo1abc/uother', 'factory/osmo1abc/utoken']
+        assert [entry['key'] for entry in index.prefix('factory/', limit=1)] == ['factory/osmo1abc/uother']
+        assert [entry['key'] for entry in index.prefix('cw20:', kind='denom')] == ['cw20:juno1xyz']
+        assert index.prefix('cw20:', kind='alias') == []
+        assert index.prefix('zzz') == []
+
+
+def test_rejects_other_files(tmp_path, index_path):
+    other = tmp_path / 'other.bin'
+    other.write_bytes(b'not an index at all')
+    with pytest.raises(ValueError, match='not a version'):
+        AssetIndex(str(other))
+    newer = tmp_path / 'newer.bin'
+    with open(index_path, 'rb') as index_file:
+        newer.write_bytes(HEADER.pack(MAGIC, VERSION + 1, 0) + index_file.read()[HEADER.size:])
+    with pytest.raises(ValueError, match='not a version'):
+        AssetIndex(str(newer))
+
+
+def test_exponent_out_of_range(tmp_path):
+    write_assetlist(tmp_path, '.', 'badchain', [asset('ubad', 'bad', 256, 'BAD')])
+    with pytest.raises(ValueError, match='badchain ubad: exponent 256 of denom bad'):
+        build_asset_index(str(tmp_path), str(tmp_path / 'assets.bin'))
+    assert not os.path.exists(tmp_path / 'assets.bin')
+
+
+def test_index_layout(index_path):
+    with open(index_path, 'rb') as index_file:
+        magic, version, count = struct.unpack('<4sII', index_file.read(12))
+    assert (magic, version, count) == (b'CRAI', 1, 20)
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('ansible')
+
+from ansible.plugins.loader import callback_loader
+
+from registry_tools.callback_plugins.provision_timing import SCHEMA
+from registry_tools.provision_report import main as report
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'registry_tools', 'callback_plugins')
+
+
+def add_run(connection, run_id, chain, started, duration, timings):
+    # timings are (host, task, position, duration) rows
+    connection.execute('INSERT INTO runs VALUES (?, ?, ?, ?, ?)',
+                       (run_id, f'install_{chain}.yml', chain, started, started + duration))
+    connection.executemany('INSERT INTO task_timings VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                           [(run_id, chain, host, task, position, 'ok', started, seconds)
+                            for host, task, position, seconds in timings])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'timings.sqlite')
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript(SCHEMA)
+        for number, build in enumerate((100, 100, 400)):
+            add_run(connection, f'osmosis-{number}', 'osmosis', 1000 * number, build + 20,
+                    [('node1', 'Build', 0, build), ('node2', 'Build', 0, build - 50), ('node1', 'Start', 1, 20)])
+        # The latest run: the slowest host counts, and the two "Restart" tasks are summed
+        add_run(connection, 'osmosis-3', 'osmosis', 3000, 260,
+                [('node1', 'Build', 0, 150), ('node2', 'Build', 0, 200), ('node1', 'Restart', 1, 20),
+                 ('node1', 'Start', 2, 10), ('node1', 'Restart', 3, 30)])
+        add_run(connection, 'juno-0', 'juno', 500, 90, [('node1', 'Build', 0, 90)])
+    connection.close()
+    return path
+
+
+def test_report(db_path, capsys):
+    report(['--db', db_path])
+    out = capsys.readouterr().out
+    assert out.startswith('5 runs of 2 chains since ')
+    chains = out.split('Slowest chains (latest run of 2 chains)\n')[1].split('\n\n')[0]
+    assert chains.splitlines() == ['     4m20s  osmosis  (osmosis-3)', '     1m30s  juno  (juno-0)']
+    steps = out.split('Slowest steps across the fleet (mean / max over latest runs)\n')[1].split('\n\n')[0]
+    assert steps.splitlines() == ['     2m25s /    3m20s  Build', '     50.0s /    50.0s  Restart',
+                                  '     10.0s /    10.0s  Start']
+    # Build 200s against a median of 100s over the previous three runs, the total 260s against 120s
+    regressions = out.split('Regressions (latest run > 1.25x median of up to 5 previous runs)\n')[1]
+    assert regressions.splitlines() == ['  osmosis: total  2m00s -> 4m20s', '  osmosis: Build  1m40s -> 3m20s']
+
+
+def test_regression_window_and_limits(db_path, capsys):
+    # Only the previous two runs: median 250s for Build and 270s for the total, no regression
+    report(['--db', db_path, '--baseline', '2', '--fail-on-regression'])
+    assert capsys.readouterr().out.endswith('previous runs)\n  none\n')
+
+    report(['--db', db_path, '--threshold', '2.1'])
+    assert capsys.readouterr().out.splitlines()[-1] == '  osmosis: total  2m00s -> 4m20s'
+
+    report(['--db', db_path, '--min-seconds', '120'])
+    assert capsys.readouterr().out.splitlines()[-1] == '  osmosis: total  2m00s -> 4m20s'
+
+    report(['--db', db_path, '--min-seconds', '150'])
+    assert capsys.readouterr().out.endswith('  none\n')
+
+
+def test_fail_on_regression(db_path):
+    with pytest.raises(SystemExit) as exit_info:
+        report(['--db', db_path, '--fail-on-regression'])
+    assert exit_info.value.code == 1
+
+
+def test_compare(db_path, capsys):
+    report(['--db', db_path, '--compare', 'osmosis-0', 'osmosis-3'])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'osmosis-0 (osmosis) -> osmosis-3 (osmosis)'
+    # Tasks only in one run show "-" and no delta
+    assert lines[1:] == [
+        '     2m00s    4m20s   +140.0s  total',
+        '     1m40s    3m20s   +100.0s  Build',
+        '         -    50.0s            Restart',
+        '     20.0s    10.0s    -10.0s  Start',
+    ]
+    with pytest.raises(SystemExit, match='Unknown run missing'):
+        report(['--db', db_path, '--compare', 'osmosis-0', 'missing'])
+
+
+def test_missing_database(tmp_path):
+    with pytest.raises(SystemExit, match='No timing database'):
+        report(['--db', str(tmp_path / 'missing.sqlite')])
+
+
+def fake_result(task, host):
+    return SimpleNamespace(_task=task, _host=SimpleNamespace(get_name=lambda: host))
+
+
+def fake_task(name, uuid):
+    return SimpleNamespace(_uuid=uuid, get_name=lambda: name)
+
+
+def test_callback_records_tasks(tmp_path, capsys):
+    callback_loader.add_directory(PLUGIN_DIR)
+    callback = callback_loader.get('provision_timing')
+    db_path = str(tmp_path / 'nested' / 'timings.sqlite')
+    callback.set_options(direct={'db_path': db_path})
+
+    callback.v2_playbook_on_start(SimpleNamespace(_file_name='/registry/osmosis/install_osmosis.yml'))
+    callback.v2_playbook_on_play_start(SimpleNamespace(get_vars=lambda: {'chain_name': 'osmosis'}, get_name=lambda: 'play'))
+    build, restart = fake_task('Build', 'uuid-build'), fake_task('Restart', 'uuid-restart')
+    callback.v2_playbook_on_task_start(build, False)
+    for host in ('node1', 'node2', 'node3'):
+        callback.v2_runner_on_start(SimpleNamespace(get_name=lambda host=host: host), build)
+    callback.v2_runner_on_ok(fake_result(build, 'node1'))
+    callback.v2_runner_on_failed(fake_result(build, 'node2'), ignore_errors=True)
+    callback.v2_runner_on_failed(fake_result(build, 'node3'))
+    callback.v2_playbook_on_handler_task_start(restart)
+    # No runner start seen: the duration is measured from the task start
+    callback.v2_runner_on_skipped(fake_result(restart, 'node1'))
+    callback.v2_runner_on_unreachable(fake_result(restart, 'node2'))
+    callback.v2_playbook_on_task_start(build, False)
+
+    rows = [(row[1], row[2], row[3], row[4], row[5]) for row in callback.rows]
+    assert rows == [
+        ('osmosis', 'node1', 'Build', 0, 'ok'),
+        ('osmosis', 'node2', 'Build', 0, 'ignored'),
+        ('osmosis', 'node3', 'Build', 0, 'failed'),
+        ('osmosis', 'node1', 'Restart', 1, 'skipped'),
+        ('osmosis', 'node2', 'Restart', 1, 'unreachable'),
+    ]
+    assert all(row[7] >= 0 for row in callback.rows)
+    assert callback.task_positions['uuid-build'] == 0
+
+    callback.v2_playbook_on_stats(None)
+    assert f'Recorded 5 task timings for run {callback.run_id}' in capsys.readouterr().out
+    connection = sqlite3.connect(db_path)
+    try:
+        assert connection.execute('SELECT playbook, chain FROM runs').fetchall() == [('install_osmosis.yml', 'osmosis')]
+        assert connection.execute('SELECT COUNT(*) FROM task_timings WHERE run_id = ?', (callback.run_id,)).fetchone() == (5,)
+    finally:
+        connection.close()
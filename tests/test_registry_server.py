@@ -0,0 +1,188 @@
+import gzip
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from registry_tools import registry_server
+from registry_tools.registry_server import RegistryServer, parse_fields, project
+
+OSMOSIS = {
+    'chain_name': 'osmosis',
+    'pretty_name': 'Osmosis',
+    'keywords': ['dex', 'amm'],
+    'staking': {'staking_tokens': [{'denom': 'uosmo'}]},
+    'apis': {'rpc': [{'address': f'https://rpc{number}.osmosis.example', 'provider': f'provider {number}'}
+                     for number in range(40)]},
+}
+JUNO = {'chain_name': 'juno', 'pretty_name': 'Juno'}
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as json_file:
+        json.dump(data, json_file)
+
+
+def touch_later(path, seconds):
+    # Coarse filesystem timestamps could otherwise hide a rewrite from tree_signature()
+    mtime = os.stat(path).st_mtime_ns + seconds * 10 ** 9
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def server(tmp_path):
+    write_json(tmp_path / 'osmosis' / 'chain.json', OSMOSIS)
+    write_json(tmp_path / 'osmosis' / 'assetlist.json', {'chain_name': 'osmosis', 'assets': [{'base': 'uosmo'}]})
+    write_json(tmp_path / 'juno' / 'chain.json', JUNO)
+    write_json(tmp_path / '_IBC' / 'juno-osmosis.json',
+               {'chain_1': {'chain_name': 'juno'}, 'chain_2': {'chain_name': 'osmosis'}, 'channels': []})
+    write_json(tmp_path / '_memo_keys' / 'ICS20_memo_keys.json', {'memo_keys': [{'key': 'wasm'}]})
+    server = RegistryServer(('127.0.0.1', 0), str(tmp_path), reload_interval=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **headers):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def get_json(server, path):
+    response, body = get(server, path)
+    assert response.status == 200
+    return json.loads(body)
+
+
+def test_parse_fields():
+    assert parse_fields([]) == ()
+    assert parse_fields(['fees, apis.rpc ,fees', 'apis.rpc.address,']) == ('apis.rpc', 'fees')
+    assert parse_fields(['apis,apis.rpc', 'apisx.rpc']) == ('apis', 'apisx.rpc')
+
+
+def test_project():
+    assert project(OSMOSIS, ('keywords.foo',)) == {}
+    assert project(OSMOSIS, ('pretty_name', 'staking.staking_tokens.denom')) == {
+        'pretty_name': 'Osmosis', 'staking': {'staking_tokens': [{'denom': 'uosmo'}]}}
+    projected = project(OSMOSIS, ('apis.rpc.address', 'apis.rpc.provider'))
+    assert projected['apis']['rpc'][3] == {'address': 'https://rpc3.osmosis.example', 'provider': 'provider 3'}
+    assert project({'list': [1, {'a': 2}, {'b': 3}]}, ('list.a',)) == {'list': [{'a': 2}, {}]}
+    assert project([OSMOSIS, JUNO], ('pretty_name',)) == [{'pretty_name': 'Osmosis'}, {'pretty_name': 'Juno'}]
+
+
+def test_routes(server):
+    assert get_json(server, '/chains') == ['juno', 'osmosis']
+    assert get_json(server, '/chains/juno') == JUNO
+    assert get_json(server, '/chains/osmosis/assetlist')['assets'] == [{'base': 'uosmo'}]
+    assert get_json(server, '/ibc') == [['juno', 'osmosis']]
+    assert get_json(server, '/ibc/osmosis/juno')['chain_1'] == {'chain_name': 'juno'}
+    assert len(get_json(server, '/ibc/Osmosis')) == 1
+    assert get_json(server, '/memo_keys') == [{'key': 'wasm'}]
+    assert get_json(server, '/chains/osmosis?fields=keywords.foo') == {}
+    assert get_json(server, '/chains/osmosis?fields=pretty_name&fields=chain_name') == {
+        'chain_name': 'osmosis', 'pretty_name': 'Osmosis'}
+
+
+def test_not_found(server):
+    for path in ('/chains/missing', '/nothing', '/chains/juno/assetlist'):
+        response, body = get(server, path)
+        assert response.status == 404
+        assert json.loads(body) == {'error': f'{path} not found'}
+
+
+def test_gzip_and_etags(server):
+    plain, plain_body = get(server, '/chains/osmosis')
+    assert plain.getheader('Content-Encoding') is None
+    compressed, compressed_body = get(server, '/chains/osmosis', **{'Accept-Encoding': 'br;q=0, gzip'})
+    assert compressed.getheader('Content-Encoding') == 'gzip'
+    assert compressed.getheader('Vary') == 'Accept-Encoding'
+    assert gzip.decompress(compressed_body) == plain_body
+    # Every representation has its own strong ETag
+    assert plain.getheader('ETag') != compressed.getheader('ETag')
+    assert compressed.getheader('ETag').endswith('-gzip"')
+
+    # Responses under MIN_COMPRESS_SIZE are sent as they are
+    small, small_body = get(server, '/chains/juno', **{'Accept-Encoding': 'gzip'})
+    assert len(small_body) < registry_server.MIN_COMPRESS_SIZE
+    assert small.getheader('Content-Encoding') is None
+    assert json.loads(small_body) == JUNO
+
+    refused, _ = get(server, '/chains/osmosis', **{'Accept-Encoding': 'gzip;q=0'})
+    assert refused.getheader('Content-Encoding') is None
+
+
+def test_not_modified(server):
+    response, _ = get(server, '/chains/osmosis', **{'Accept-Encoding': 'gzip'})
+    etag = response.getheader('ETag')
+    for if_none_match in (etag, f'"other", {etag}', '*'):
+        cached, body = get(server, '/chains/osmosis', **{'Accept-Encoding': 'gzip', 'If-None-Match': if_none_match})
+        assert cached.status == 304 and body == b''
+        assert cached.getheader('ETag') == etag
+    # The identity representation does not match the gzip ETag
+    response, _ = get(server, '/chains/osmosis', **{'If-None-Match': etag})
+    assert response.status == 200
+
+
+def test_response_cache_eviction(server, monkeypatch):
+    monkeypatch.setattr(registry_server, 'MAX_CACHED_RESPONSES', 2)
+    for fields in ('chain_name', 'pretty_name', 'keywords'):
+        server.response('/chains/osmosis', (fields,), 'identity')
+    assert list(server.responses) == [('/chains/osmosis', ('pretty_name',), 'identity'),
+                                      ('/chains/osmosis', ('keywords',), 'identity')]
+    # A cache hit moves the response to the back of the queue
+    server.response('/chains/osmosis', ('pretty_name',), 'identity')
+    server.response('/chains/juno', (), 'identity')
+    assert list(server.responses) == [('/chains/osmosis', ('pretty_name',), 'identity'),
+                                      ('/chains/juno', (), 'identity')]
+    # Equivalent ?fields= lists share one entry
+    get(server, '/chains/osmosis?fields=keywords,chain_name,keywords')
+    get(server, '/chains/osmosis?fields=chain_name&fields=keywords')
+    assert list(server.responses)[-1] == ('/chains/osmosis', ('chain_name', 'keywords'), 'identity')
+    assert len(server.responses) == 2
+
+
+def test_reload(server, tmp_path):
+    assert server.reload() is False
+    write_json(tmp_path / 'stargaze' / 'chain.json', {'chain_name': 'stargaze'})
+    assert server.reload() is True
+    assert get_json(server, '/chains') == ['juno', 'osmosis', 'stargaze']
+
+
+def test_watcher_reloads(tmp_path):
+    write_json(tmp_path / 'juno' / 'chain.json', JUNO)
+    watched = RegistryServer(('127.0.0.1', 0), str(tmp_path), reload_interval=0.05)
+    try:
+        assert sorted(watched.index.chains) == ['juno']
+        write_json(tmp_path / 'osmosis' / 'chain.json', OSMOSIS)
+        deadline = time.monotonic() + 5
+        while 'osmosis' not in watched.index.chains and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert sorted(watched.index.chains) == ['juno', 'osmosis']
+    finally:
+        watched.server_close()
+
+
+def test_reload_keeps_index_on_broken_file(server, tmp_path, capsys):
+    get_json(server, '/chains')
+    (tmp_path / 'juno' / 'chain.json').write_text('{"chain_name": ')
+    touch_later(tmp_path / 'juno' / 'chain.json', 1)
+    assert server.reload() is False
+    assert 'Reload failed' in capsys.readouterr().out
+    assert get_json(server, '/chains/juno') == JUNO
+    # The same broken tree is not rebuilt on every poll
+    assert server.reload() is False
+    assert capsys.readouterr().out == ''
+
+    write_json(tmp_path / 'juno' / 'chain.json', dict(JUNO, pretty_name='Juno Network'))
+    touch_later(tmp_path / 'juno' / 'chain.json', 2)
+    assert server.reload() is True
+    assert get_json(server, '/chains/juno')['pretty_name'] == 'Juno Network'
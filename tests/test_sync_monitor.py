@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from registry_tools.mock_daemon import MockChain, make_handler
+from registry_tools.sync_monitor import SyncMonitor, fetch_json, parse_inventory, rate
+
+
+@pytest.fixture
+def mock_daemon(tmp_path):
+    # Serve the mock daemon's /status at a given height, the chain itself is never started
+    servers = []
+
+    def start(height, catch_up_seconds=0, name='node'):
+        home = tmp_path / name
+        os.makedirs(home / 'data')
+        (home / 'data' / 'mock_height').write_text(str(height))
+        chain = MockChain(str(home), 'mock-1', 1, catch_up_seconds, 10, None, 'upgrade')
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(chain, 'v1.0.0'))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def raw_server(response):
+    # Answer every request with the given raw HTTP response bytes
+    async def handle(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+    return asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def test_parse_inventory_merges_groups(tmp_path):
+    for chain in ('osmosis', 'juno'):
+        os.makedirs(tmp_path / chain)
+        (tmp_path / chain / 'chain.json').write_text('{}')
+    inventory = tmp_path / 'hosts.ini'
+    inventory.write_text('''
+[osmosis]
+node1 ansible_host=10.0.0.1
+
+[sentries]
+node1
+node2 rpc_port=26667
+
+[juno]
+node2 ansible_host=10.0.0.2
+
+[cosmos:children]
+osmosis
+juno
+
+[cosmos:vars]
+rpc_port=36657
+
+[osmosis:vars]
+rpc_port=46657
+''')
+    nodes = parse_inventory(str(inventory), str(tmp_path))
+    assert nodes == [
+        {'host': 'node1', 'chain': 'osmosis', 'rpc_url': 'http://10.0.0.1:46657'},
+        {'host': 'node2', 'chain': 'juno', 'rpc_url': 'http://10.0.0.2:26667'},
+    ]
+
+
+def test_parse_inventory_chain_from_parent_group(tmp_path):
+    os.makedirs(tmp_path / 'osmosis')
+    (tmp_path / 'osmosis' / 'chain.json').write_text('{}')
+    inventory = tmp_path / 'hosts.ini'
+    inventory.write_text('[rpc]\nnode1\n\n[sentries]\nnode2\n\n[osmosis:children]\nrpc\n')
+    nodes = parse_inventory(str(inventory), str(tmp_path))
+    assert nodes == [{'host': 'node1', 'chain': 'osmosis', 'rpc_url': 'http://node1:26657'}]
+
+
+def test_fetch_json_status(mock_daemon):
+    url = mock_daemon(42)
+    response = asyncio.run(fetch_json(url + '/status'))
+    assert response['result']['sync_info']['latest_block_height'] == '42'
+
+
+def test_fetch_json_chunked():
+    body = json.dumps({'result': {'sync_info': {'latest_block_height': '7'}}}).encode('utf-8')
+    chunks = b''.join(b'%x;ext=1\r\n%s\r\n' % (len(part), part) for part in (body[:10], body[10:]))
+
+    async def fetch():
+        server = await raw_server(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n' + chunks + b'0\r\n\r\n')
+        async with server:
+            return await fetch_json(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/status")
+
+    assert asyncio.run(fetch()) == {'result': {'sync_info': {'latest_block_height': '7'}}}
+
+
+def test_fetch_json_error_status():
+    async def fetch():
+        server = await raw_server(b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n')
+        async with server:
+            return await fetch_json(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/status")
+
+    with pytest.raises(RuntimeError, match='HTTP 503'):
+        asyncio.run(fetch())
+
+
+def test_rate():
+    assert rate([]) is None
+    assert rate([(10, 100)]) is None
+    assert rate([(10, 100), (10, 120)]) is None
+    assert rate([(0, 100), (5, 110), (10, 150)]) == 5
+
+
+def test_poll_against_mock_daemons(mock_daemon):
+    node_url = mock_daemon(100, catch_up_seconds=60, name='node')
+    network_url = mock_daemon(150, name='network')
+    nodes = [{'host': 'node1', 'chain': 'mock', 'rpc_url': node_url},
+             {'host': 'node2', 'chain': 'mock', 'rpc_url': 'http://127.0.0.1:9'}]
+
+    async def poll():
+        monitor = SyncMonitor(nodes, {'mock': [network_url]}, timeout=2)
+        await monitor.poll_once()
+        return monitor.summary()
+
+    summary = asyncio.run(poll())
+    node1, node2 = summary['nodes']
+    assert node1['up'] and node1['height'] == 100 and node1['catching_up']
+    assert node1['network_height'] == 150 and node1['blocks_behind'] == 50
+    # A single poll gives no rate yet, so no ETA either
+    assert node1['eta_seconds'] is None
+    assert not node2['up'] and 'blocks_behind' not in node2
+    assert (summary['up'], summary['synced'], summary['total']) == (1, 0, 2)
+
+
+def make_monitor(node_samples, network_samples, catching_up=True):
+    async def build():
+        return SyncMonitor([{'host': 'node1', 'chain': 'mock', 'rpc_url': 'http://127.0.0.1:9'}], {'mock': []})
+
+    monitor = asyncio.run(build())
+    monitor.node_samples['node1'] = deque(node_samples)
+    monitor.network_samples['mock'] = deque(network_samples)
+    monitor.node_status['node1'] = {'up': True, 'height': node_samples[-1][1], 'catching_up': catching_up, 'network': 'mock-1'}
+    return monitor
+
+
+def test_summary_eta():
+    # The node gains 9 blocks per second on a chain producing 1, 810 blocks behind
+    node = make_monitor([(0, 100), (10, 200)], [(0, 1000), (10, 1010)]).summary()['nodes'][0]
+    assert node['blocks_behind'] == 810
+    assert node['blocks_per_second'] == 10 and node['network_blocks_per_second'] == 1
+    assert node['eta_seconds'] == 90
+
+
+def test_summary_eta_not_gaining():
+    node = make_monitor([(0, 100), (10, 105)], [(0, 1000), (10, 1010)]).summary()['nodes'][0]
+    assert node['blocks_behind'] == 905 and node['eta_seconds'] is None and not node['synced']
+
+
+def test_summary_stalled_node():
+    # Halted after syncing: catching_up is false, but the node is far behind and not moving
+    monitor = make_monitor([(0, 100), (10, 100)], [(0, 10000), (10, 10010)], catching_up=False)
+    summary = monitor.summary()
+    node = summary['nodes'][0]
+    assert node['blocks_behind'] == 9910 and node['blocks_per_second'] == 0
+    assert node['eta_seconds'] is None and not node['synced']
+    assert summary['synced'] == 0
+    assert 'chain_node_sync_eta_seconds{' not in monitor.metrics()
+
+
+def test_summary_within_tolerance():
+    # A couple of blocks behind the public tip is still in sync, even while catching_up is reported
+    summary = make_monitor([(0, 1000), (10, 1008)], [(0, 1000), (10, 1010)]).summary()
+    assert summary['nodes'][0]['blocks_behind'] == 2 and summary['nodes'][0]['eta_seconds'] == 0
+    assert summary['synced'] == 1
+
+
+def test_summary_synced_node():
+    # A node ahead of the public RPCs is not behind
+    node = make_monitor([(0, 100), (10, 1020)], [(0, 1000), (10, 1010)], catching_up=False).summary()['nodes'][0]
+    assert node['blocks_behind'] == 0 and node['eta_seconds'] == 0 and node['synced']
+
+
+def test_metrics():
+    metrics = make_monitor([(0, 100), (10, 200)], [(0, 1000), (10, 1010)]).metrics()
+    lines = metrics.splitlines()
+    assert '# TYPE chain_node_height gauge' in lines
+    assert 'chain_node_up{host="node1",chain="mock"} 1' in lines
+    assert 'chain_node_height{host="node1",chain="mock"} 200' in lines
+    assert 'chain_node_blocks_behind{host="node1",chain="mock"} 810' in lines
+    assert 'chain_node_sync_eta_seconds{host="node1",chain="mock"} 90.0' in lines
+    assert 'chain_network_height{chain="mock"} 1010' in lines
+    assert metrics.endswith('\n')
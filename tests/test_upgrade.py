@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+import yaml
+
+from registry_tools.mock_daemon import MockChain
+from registry_tools.mock_daemon import main as mock_daemon_main
+from registry_tools.upgrade import binary_source, generate_upgrade_playbook, select_upgrade
+
+ARCHIVE = 'https://example.com/v2/mockd-linux-amd64.tar.gz'
+CHECKSUM = 'sha256:' + 'ab' * 32
+
+
+def chain_info(versions):
+    return {
+        'chain_name': 'mock',
+        'pretty_name': 'Mock',
+        'chain_id': 'mock-1',
+        'daemon_name': 'mockd',
+        'node_home': '$HOME/.mockd',
+        'rpc_port': 26657,
+        'codebase': {'git_repo': 'https://example.com/mock', 'versions': versions},
+    }
+
+
+def versions():
+    return [
+        {'name': 'v1', 'tag': 'v1.0.0'},
+        {'name': 'v2', 'tag': 'v2.0.0', 'height': 120,
+         'binaries': {'linux/amd64': f'{ARCHIVE}?checksum={CHECKSUM}'}},
+        {'name': 'v3', 'tag': 'v3.0.0', 'binaries': {'linux/amd64': 'https://example.com/v3/mockd'}},
+    ]
+
+
+def tasks(plays, name):
+    # Tasks of one play, with the tasks inside blocks flattened in place
+    found = []
+    for task in plays[name]['tasks']:
+        found.extend(task['block'] if 'block' in task else [task])
+    return found
+
+
+def render(upgrade_name, **kwargs):
+    info = chain_info(versions())
+    playbook = generate_upgrade_playbook(info, select_upgrade(info, upgrade_name), **kwargs)
+    return playbook if playbook is None else {play['name']: play for play in yaml.safe_load(playbook)}
+
+
+def test_select_upgrade():
+    info = chain_info(versions())
+    assert select_upgrade(info, 'v2')['height'] == 120
+    assert select_upgrade(info)['name'] == 'v3'
+    assert select_upgrade(info, 'v9') is None
+    assert select_upgrade(chain_info([])) is None
+
+
+def test_binary_source():
+    assert binary_source(versions()[1]) == (ARCHIVE, CHECKSUM)
+    assert binary_source(versions()[2]) == ('https://example.com/v3/mockd', None)
+    assert binary_source(versions()[1], 'darwin/arm64') == (None, None)
+    assert binary_source(versions()[0]) == (None, None)
+
+
+def test_archive_download_is_checksummed():
+    plays = render('v2', groups=['sentries', 'rpc'])
+    assert list(plays) == ['Stage Mock v2 for cosmovisor', 'Roll Mock onto v2 (sentries)', 'Roll Mock onto v2 (rpc)']
+    stage = tasks(plays, 'Stage Mock v2 for cosmovisor')
+    download = next(task for task in stage if 'get_url' in task)['get_url']
+    assert download == {'url': ARCHIVE, 'dest': '/tmp/mockd-{{ upgrade_name }}/mockd-linux-amd64.tar.gz', 'checksum': CHECKSUM}
+    unarchive = next(task for task in stage if 'unarchive' in task and 'mockd' in task['name'])['unarchive']
+    assert unarchive['src'] == download['dest']
+    find = next(task for task in stage if 'find' in task)['find']
+    assert find['patterns'] == 'mockd'
+    assert next(task for task in stage if 'assert' in task)['assert']['that'] == 'found_daemon.matched == 1'
+    staged = next(task for task in stage if 'copy' in task and task['copy']['dest'] == '{{ upgrade_bin_dir }}/mockd')
+    assert 'when' not in staged
+
+
+def test_switch_needs_confirmed_height():
+    plays = render('v2', groups=['sentries'])
+    play = plays['Roll Mock onto v2 (sentries)']
+    assert play['serial'] == '{{ batch_size }}' and play['max_fail_percentage'] == 0
+    assert play['vars']['upgrade_height'] == '120'
+    rolling = tasks(plays, 'Roll Mock onto v2 (sentries)')
+    names = [task['name'] for task in rolling]
+    # An unreachable node is only switched after its upgrade-info.json confirms the halt
+    assert names.index('Read the upgrade plan of a stopped node') < names.index('Decide whether to switch to {{ upgrade_name }} now')
+    guard = next(task for task in rolling if 'fail' in task)
+    assert guard['when'].startswith('node_status is failed and (upgrade_info is failed')
+    assert names.index(guard['name']) < names.index('Point cosmovisor at {{ upgrade_name }}')
+
+
+def test_version_without_height_needs_flag(capsys):
+    assert render('v3') is None
+    assert 'has no upgrade height' in capsys.readouterr().out
+    plays = render('v3', no_height=True)
+    assert plays['Roll Mock onto v3 (all)']['vars']['upgrade_height'] == '0'
+    download = next(task for task in tasks(plays, 'Stage Mock v3 for cosmovisor') if 'get_url' in task)['get_url']
+    assert download == {'url': 'https://example.com/v3/mockd', 'dest': '{{ upgrade_bin_dir }}/mockd', 'mode': '0755'}
+
+
+def test_source_build_stages_exact_binary():
+    info = chain_info([{'name': 'v1', 'tag': 'v1.0.0'}, {'name': 'v2', 'tag': 'v2.0.0', 'height': 50}])
+    plays = {play['name']: play for play in yaml.safe_load(generate_upgrade_playbook(info, select_upgrade(info)))}
+    stage = tasks(plays, 'Stage Mock v2 for cosmovisor')
+    assert next(task for task in stage if 'git' in task)['git']['version'] == 'v2.0.0'
+    find = next(task for task in stage if 'find' in task)['find']
+    assert find == {'paths': '{{ ansible_env.HOME }}/node-upgrade', 'patterns': 'mockd', 'recurse': True, 'file_type': 'file'}
+
+
+def test_mock_daemon_halts_and_resumes(tmp_path):
+    home = str(tmp_path)
+    chain = MockChain(home, 'mock-1', 0.001, 0, 10, 5, 'v2')
+    chain.produce_blocks()
+    assert chain.halted.is_set() and chain.height == 4
+    with open(os.path.join(home, 'data', 'upgrade-info.json')) as upgrade_file:
+        assert json.load(upgrade_file) == {'name': 'v2', 'height': 5, 'info': ''}
+
+    # The upgraded binary continues from the persisted height
+    resumed = MockChain(home, 'mock-1', 0.001, 0, 10, None, 'upgrade')
+    assert resumed.height == 4
+    producer = threading.Thread(target=resumed.produce_blocks)
+    producer.start()
+    deadline = time.monotonic() + 5
+    while resumed.height < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    resumed.halted.set()
+    producer.join()
+    assert resumed.height >= 7
+    assert resumed.status('v2.0.0')['result']['sync_info']['latest_block_height'] == str(resumed.height)
+
+
+def test_mock_daemon_exit_code(tmp_path, capsys):
+    # cosmovisor only switches binaries when the daemon exits after writing upgrade-info.json
+    assert mock_daemon_main(['start', '--home', str(tmp_path), '--rpc-port', '0', '--block-time', '0.001',
+                             '--halt-height', '3', '--halt-upgrade', 'v2']) == 1
+    assert 'UPGRADE "v2" NEEDED at height: 3' in capsys.readouterr().out
+    assert mock_daemon_main(['version', '--version', 'v2.0.0']) == 0